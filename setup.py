@@ -47,6 +47,10 @@ setup(
     ],
     extras_require={
         "dev": ["pytest>=7.0", "pytest-cov>=4.0", "black>=22.0", "flake8>=5.0"],
+        "fast": ["orjson>=3.6", "ijson>=3.1", "msgspec>=0.18", "numpy>=1.20"],
+        "jit": ["numpy>=1.20", "numba>=0.56"],
+        "remux": ["av>=9.0"],
+        "grid": ["Pillow>=9.1", "pyvips>=2.2"],
     },
     entry_points={
         "console_scripts": [
@@ -5,31 +5,58 @@ A comprehensive library for video downloading, splitting, and clipping operation
 with support for batch processing and flexible configuration management.
 """
 
-# Main classes
-from .core import (
-    VideoProcessor, ProcessorConfig, create_video_processor,
-    FFmpegWrapper, MediaInfo
-)
-
-# Configuration management
-from .config import (
-    ConfigurationManager, ProcessingConfig, TaskConfig,
-    load_config_from_file, TaskTemplates, WorkflowBuilder
-)
-
-# Utilities
-from .utils import (
-    FileManager, FormatParser, PathBuilder,
-    InputValidator, ConfigValidator, ValidationError
-)
+import importlib
+
+# Public names resolved lazily on first access (PEP 562), mapped to the
+# subpackage that provides them
+_LAZY = {
+    # Main classes
+    'VideoProcessor': '.core',
+    'ProcessorConfig': '.core',
+    'create_video_processor': '.core',
+    'FFmpegWrapper': '.core',
+    'MediaInfo': '.core',
+
+    # Configuration management
+    'ConfigurationManager': '.config',
+    'ProcessingConfig': '.config',
+    'TaskConfig': '.config',
+    'load_config_from_file': '.config',
+    'TaskTemplates': '.config',
+    'WorkflowBuilder': '.config',
+
+    # Utilities
+    'FileManager': '.utils',
+    'FormatParser': '.utils',
+    'PathBuilder': '.utils',
+    'InputValidator': '.utils',
+    'ConfigValidator': '.utils',
+    'ValidationError': '.utils',
+
+    # Convenience imports for backward compatibility
+    'download_video': '.core',
+    'split_video_by_size': '.core',
+    'clip_video_segments': '.core',
+    'create_gif_clips': '.core',
+}
 
 # Version info
 __version__ = "1.0.0"
 __author__ = "Video Processing Team"
 __description__ = "Professional video processing library with FFmpeg integration"
 
-# Convenience imports for backward compatibility
-from .core import download_video, split_video_by_size, clip_video_segments, create_gif_clips
+def __getattr__(name: str):
+    """Import public names on first access and cache them on the package"""
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
 # Main API classes for easy access
 __all__ = [
@@ -72,7 +99,7 @@ def get_version() -> str:
     """Get library version"""
     return __version__
 
-def create_processor(**kwargs) -> VideoProcessor:
+def create_processor(**kwargs) -> 'VideoProcessor':
     """Create video processor with optional configuration
     
     Args:
@@ -81,6 +108,7 @@ def create_processor(**kwargs) -> VideoProcessor:
     Returns:
         VideoProcessor: Configured processor instance
     """
+    from .core import create_video_processor
     return create_video_processor(**kwargs)
 
 # Quick start functions
@@ -1,15 +1,36 @@
 """
 Configuration management for video processing
 """
-from .config_manager import (
-    ConfigurationManager, TaskConfig, ProcessingConfig,
-    load_config_from_file, create_simple_download_config,
-    create_simple_split_config, create_simple_clip_config
-)
-from .task_definitions import (
-    TaskTemplates, WorkflowBuilder,
-    create_download_split_workflow, create_multi_clip_workflow
-)
+import importlib
+
+# Public names resolved lazily on first access (PEP 562), mapped to the
+# submodule that provides them
+_LAZY = {
+    'ConfigurationManager': '.config_manager',
+    'TaskConfig': '.config_manager',
+    'ProcessingConfig': '.config_manager',
+    'load_config_from_file': '.config_manager',
+    'create_simple_download_config': '.config_manager',
+    'create_simple_split_config': '.config_manager',
+    'create_simple_clip_config': '.config_manager',
+    'TaskTemplates': '.task_definitions',
+    'WorkflowBuilder': '.task_definitions',
+    'create_download_split_workflow': '.task_definitions',
+    'create_multi_clip_workflow': '.task_definitions',
+}
+
+def __getattr__(name: str):
+    """Import public names on first access and cache them on the package"""
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
 __all__ = [
     # Core classes
@@ -3,32 +3,97 @@ Configuration management for video processing operations
 """
 import json
 import os
-from typing import Dict, Any, List, Optional, Union
-from dataclasses import dataclass, asdict
+import sys
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Set, Union
+from dataclasses import dataclass, field
 from ..utils import InputValidator, ConfigValidator, ValidationError
+from ..utils.compat import DATACLASS_SLOTS
+
+# orjson for faster configuration parsing (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# ijson for streaming very large configuration files (optional)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# msgspec for decoding and schema-checking configurations in one pass (optional)
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+# Files larger than this are parsed task-by-task when ijson is available
+STREAMING_THRESHOLD_BYTES = 32 * 1024 ** 2
+
+if MSGSPEC_AVAILABLE:
+    class _RawTask(msgspec.Struct):
+        """Schema for a single task entry in a configuration file"""
+        type: str
+        parameters: Dict[str, Any]
+    
+    class _RawConfig(msgspec.Struct):
+        """Schema for a configuration file"""
+        tasks: List[_RawTask]
+        global_settings: Optional[Dict[str, Any]] = None
 
 @dataclass
 class TaskConfig:
     """Configuration for a single task"""
+    # Declared by hand so the to_dict cache gets a slot without becoming a dataclass field
+    __slots__ = ('task_type', 'parameters', '_serialized')
+    
     task_type: str  # 'download', 'split', 'clip'
     parameters: Dict[str, Any]
     
+    # Validator per task type (read-only class attribute, not a dataclass field)
+    _VALIDATORS = MappingProxyType({
+        'download': ConfigValidator.validate_download_config,
+        'split': ConfigValidator.validate_split_config,
+        'clip': ConfigValidator.validate_clip_config,
+    })
+    # Task types whose validator accepts a precomputed source file existence map
+    _SOURCE_FILE_TYPES = frozenset({'split', 'clip'})
+    
+    def __post_init__(self):
+        # Share one string object per task type across all tasks
+        if isinstance(self.task_type, str):
+            self.task_type = sys.intern(self.task_type)
+        self._serialized = None
+    
     def validate(self) -> tuple[bool, List[str]]:
         """Validate task configuration"""
-        if self.task_type == 'download':
-            return ConfigValidator.validate_download_config(self.parameters)
-        elif self.task_type == 'split':
-            return ConfigValidator.validate_split_config(self.parameters)
-        elif self.task_type == 'clip':
-            return ConfigValidator.validate_clip_config(self.parameters)
-        else:
+        validator = self._VALIDATORS.get(self.task_type)
+        if validator is None:
             return False, [f"Unknown task type: {self.task_type}"]
+        return validator(self.parameters)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert task to its configuration file representation (cached)"""
+        serialized = self._serialized
+        # Rebuild when either field was reassigned; in-place parameter edits show through the shared dict
+        if (serialized is None or serialized['type'] is not self.task_type
+                or serialized['parameters'] is not self.parameters):
+            serialized = {'type': self.task_type, 'parameters': self.parameters}
+            self._serialized = serialized
+        return serialized
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ProcessingConfig:
     """Complete configuration for video processing"""
     tasks: List[TaskConfig]
     global_settings: Optional[Dict[str, Any]] = None
+    _merged_cache: Dict[int, Dict[str, Any]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
     
     def __post_init__(self):
         if self.global_settings is None:
@@ -42,61 +107,96 @@ class ProcessingConfig:
             errors.append("No tasks specified")
             return False, errors
         
-        # Validate each task
-        for i, task in enumerate(self.tasks):
-            is_valid, task_errors = task.validate()
+        # Check all source files up front and hand the results to the per-task checks
+        source_types = TaskConfig._SOURCE_FILE_TYPES
+        existing = InputValidator.validate_files_exist([
+            task.parameters['source_file'] for task in self.tasks
+            if task.task_type in source_types and isinstance(task.parameters, dict)
+            and isinstance(task.parameters.get('source_file'), str)
+        ])
+        
+        # Validate each task, dispatching straight to the validator
+        validators = TaskConfig._VALIDATORS
+        for i, task in enumerate(self.tasks, 1):
+            validator = validators.get(task.task_type)
+            if validator is None:
+                errors.append(f"Task {i}: Unknown task type: {task.task_type}")
+                continue
+            
+            if task.task_type in source_types:
+                is_valid, task_errors = validator(task.parameters, existing)
+            else:
+                is_valid, task_errors = validator(task.parameters)
             if not is_valid:
-                for error in task_errors:
-                    errors.append(f"Task {i+1}: {error}")
+                errors.extend(f"Task {i}: {error}" for error in task_errors)
         
         return len(errors) == 0, errors
     
-    def get_merged_params(self, task_index: int) -> Dict[str, Any]:
-        """Get task parameters merged with global settings"""
+    def get_merged_params(self, task_index: int) -> Mapping[str, Any]:
+        """Get task parameters merged with global settings
+        
+        The merged dict is cached per task index and shared between calls, so
+        it is returned as a read-only view; copy it with dict() to change it.
+        Call invalidate_merged() after mutating a task or the global settings.
+        """
         if task_index >= len(self.tasks):
             raise IndexError(f"Task index {task_index} out of range")
         
-        # Start with global settings
-        merged = self.global_settings.copy()
-        
-        # Override with task-specific parameters
-        merged.update(self.tasks[task_index].parameters)
+        merged = self._merged_cache.get(task_index)
+        if merged is None:
+            # Task-specific parameters override global settings
+            merged = {**self.global_settings, **self.tasks[task_index].parameters}
+            self._merged_cache[task_index] = merged
         
-        return merged
+        return MappingProxyType(merged)
+    
+    def invalidate_merged(self, task_index: Optional[int] = None) -> None:
+        """Drop cached merged parameters for one task, or all tasks"""
+        if task_index is None:
+            self._merged_cache.clear()
+        else:
+            self._merged_cache.pop(task_index, None)
 
 class ConfigurationManager:
     """Manage video processing configurations"""
     
     def __init__(self):
         self.current_config: Optional[ProcessingConfig] = None
+        self._created_dirs: Set[str] = set()
     
     def load_from_dict(self, config_dict: Dict[str, Any]) -> ProcessingConfig:
         """Load configuration from dictionary"""
-        # Parse tasks
-        tasks = []
         if 'tasks' not in config_dict:
             raise ValidationError("Configuration must contain 'tasks' field")
         
-        for i, task_data in enumerate(config_dict['tasks']):
-            if not isinstance(task_data, dict):
-                raise ValidationError(f"Task {i+1} must be a dictionary")
-            
-            if 'type' not in task_data:
-                raise ValidationError(f"Task {i+1} missing 'type' field")
-            
-            if 'parameters' not in task_data:
-                raise ValidationError(f"Task {i+1} missing 'parameters' field")
-            
-            task = TaskConfig(
-                task_type=task_data['type'],
-                parameters=task_data['parameters']
-            )
-            tasks.append(task)
+        # Parse tasks
+        tasks = [self._parse_task(i, task_data)
+                 for i, task_data in enumerate(config_dict['tasks'])]
+        
+        return self._build_config(tasks, config_dict.get('global_settings', {}))
+    
+    def _parse_task(self, index: int, task_data: Any) -> TaskConfig:
+        """Parse a single raw task entry"""
+        if not isinstance(task_data, dict):
+            raise ValidationError(f"Task {index+1} must be a dictionary")
+        
+        if 'type' not in task_data:
+            raise ValidationError(f"Task {index+1} missing 'type' field")
+        
+        if 'parameters' not in task_data:
+            raise ValidationError(f"Task {index+1} missing 'parameters' field")
         
-        # Create configuration
+        return TaskConfig(
+            task_type=task_data['type'],
+            parameters=task_data['parameters']
+        )
+    
+    def _build_config(self, tasks: List[TaskConfig], 
+                      global_settings: Dict[str, Any]) -> ProcessingConfig:
+        """Create, validate and store configuration from parsed tasks"""
         config = ProcessingConfig(
             tasks=tasks,
-            global_settings=config_dict.get('global_settings', {})
+            global_settings=global_settings
         )
         
         # Validate
@@ -112,48 +212,106 @@ class ConfigurationManager:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Configuration file not found: {file_path}")
         
+        # Avoid building the full JSON document for very large files
+        if IJSON_AVAILABLE and os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES:
+            return self.load_from_file_streaming(file_path)
+        
+        if MSGSPEC_AVAILABLE:
+            return self._load_from_file_typed(file_path)
+        
+        return self.load_from_dict(self._read_json(file_path))
+    
+    def _load_from_file_typed(self, file_path: str) -> ProcessingConfig:
+        """Load configuration, checking the task schema while decoding (requires msgspec)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                config_dict = json.load(f)
+            with open(file_path, 'rb') as f:
+                raw = msgspec.json.decode(f.read(), type=_RawConfig)
+        except msgspec.ValidationError as e:
+            raise ValidationError(f"Invalid configuration: {e}")
+        except msgspec.DecodeError as e:
+            raise ValidationError(f"Invalid JSON in configuration file: {e}")
+        except Exception as e:
+            raise ValidationError(f"Error reading configuration file: {e}")
+        
+        tasks = [TaskConfig(task_type=task.type, parameters=task.parameters)
+                 for task in raw.tasks]
+        
+        return self._build_config(tasks, raw.global_settings)
+    
+    @staticmethod
+    def _read_json(file_path: str) -> Any:
+        """Read and decode a JSON configuration file"""
+        try:
+            # Parse raw bytes so the decoder handles UTF-8 in one pass
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
         except json.JSONDecodeError as e:
             raise ValidationError(f"Invalid JSON in configuration file: {e}")
         except Exception as e:
             raise ValidationError(f"Error reading configuration file: {e}")
+    
+    def load_from_file_streaming(self, file_path: str) -> ProcessingConfig:
+        """Load configuration from JSON file one task at a time (requires ijson)"""
+        if not IJSON_AVAILABLE:
+            raise ValidationError("Streaming configuration loading requires ijson")
+        
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Configuration file not found: {file_path}")
+        
+        try:
+            with open(file_path, 'rb') as f:
+                tasks = [self._parse_task(i, task_data)
+                         for i, task_data in enumerate(ijson.items(f, 'tasks.item', use_float=True))]
+                
+                # Second pass picks up global settings wherever they appear
+                f.seek(0)
+                global_settings = next(ijson.items(f, 'global_settings', use_float=True), {})
+        except ValidationError:
+            raise
+        except ijson.JSONError as e:
+            raise ValidationError(f"Invalid JSON in configuration file: {e}")
+        except Exception as e:
+            raise ValidationError(f"Error reading configuration file: {e}")
         
-        return self.load_from_dict(config_dict)
+        return self._build_config(tasks, global_settings)
     
     def save_to_file(self, config: ProcessingConfig, file_path: str) -> None:
         """Save configuration to JSON file"""
         config_dict = self._config_to_dict(config)
         
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # Ensure directory exists (bare filenames write to the cwd)
+        directory = os.path.dirname(file_path)
+        if directory and directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(config_dict, f, indent=2, ensure_ascii=False)
+            if ORJSON_AVAILABLE:
+                # orjson indents in C and emits UTF-8 bytes directly
+                payload = orjson.dumps(
+                    config_dict,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+                )
+                with open(file_path, 'wb') as f:
+                    f.write(payload)
+            else:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    json.dump(config_dict, f, indent=2, ensure_ascii=False)
         except Exception as e:
             raise ValidationError(f"Error writing configuration file: {e}")
     
     def _config_to_dict(self, config: ProcessingConfig) -> Dict[str, Any]:
         """Convert configuration to dictionary"""
-        tasks_list = []
-        for task in config.tasks:
-            tasks_list.append({
-                'type': task.task_type,
-                'parameters': task.parameters
-            })
-        
-        config_dict = {
-            'tasks': tasks_list
-        }
+        config_dict = {'tasks': [task.to_dict() for task in config.tasks]}
         
         if config.global_settings:
             config_dict['global_settings'] = config.global_settings
         
         return config_dict
     
-    def create_download_task(self, url: str, output_filename: str) -> TaskConfig:
+    @staticmethod
+    def create_download_task(url: str, output_filename: str) -> TaskConfig:
         """Create download task configuration"""
         return TaskConfig(
             task_type='download',
@@ -163,8 +321,9 @@ class ConfigurationManager:
             }
         )
     
-    def create_split_task(self, source_file: str, output_name: str, 
-                         output_extension: str, max_size: str) -> TaskConfig:
+    @staticmethod
+    def create_split_task(source_file: str, output_name: str, 
+                          output_extension: str, max_size: str) -> TaskConfig:
         """Create split task configuration"""
         return TaskConfig(
             task_type='split',
@@ -176,7 +335,8 @@ class ConfigurationManager:
             }
         )
     
-    def create_clip_task(self, source_file: str, output_name: str,
+    @staticmethod
+    def create_clip_task(source_file: str, output_name: str,
                         output_extension: str, intervals: List[Dict[str, Any]],
                         video_codec: str = 'copy', audio_codec: str = 'copy') -> TaskConfig:
         """Create clip task configuration"""
@@ -192,20 +352,59 @@ class ConfigurationManager:
             }
         )
     
-    def create_config(self, tasks: List[TaskConfig], 
+    @staticmethod
+    def create_config(tasks: List[TaskConfig], 
                      global_settings: Optional[Dict[str, Any]] = None) -> ProcessingConfig:
         """Create complete processing configuration"""
         return ProcessingConfig(tasks=tasks, global_settings=global_settings)
     
     def validate_config_file(self, file_path: str) -> tuple[bool, List[str]]:
         """Validate configuration file without loading it"""
+        if not os.path.exists(file_path):
+            return False, [f"Configuration file not found: {file_path}"]
+        
         try:
-            config = self.load_from_file(file_path)
-            return True, []
-        except (ValidationError, FileNotFoundError) as e:
+            return self._validate_dict(self._read_json(file_path))
+        except ValidationError as e:
             return False, [str(e)]
         except Exception as e:
             return False, [f"Unexpected error: {e}"]
+    
+    @staticmethod
+    def _validate_dict(config_dict: Any) -> tuple[bool, List[str]]:
+        """Validate a raw configuration dict without building config objects"""
+        if not isinstance(config_dict, dict) or 'tasks' not in config_dict:
+            return False, ["Configuration must contain 'tasks' field"]
+        
+        tasks = config_dict['tasks']
+        if not tasks:
+            return False, ["No tasks specified"]
+        
+        errors = []
+        validators = TaskConfig._VALIDATORS
+        for i, task_data in enumerate(tasks, 1):
+            if not isinstance(task_data, dict):
+                errors.append(f"Task {i} must be a dictionary")
+                continue
+            
+            if 'type' not in task_data:
+                errors.append(f"Task {i} missing 'type' field")
+                continue
+            
+            if 'parameters' not in task_data:
+                errors.append(f"Task {i} missing 'parameters' field")
+                continue
+            
+            validator = validators.get(task_data['type'])
+            if validator is None:
+                errors.append(f"Task {i}: Unknown task type: {task_data['type']}")
+                continue
+            
+            is_valid, task_errors = validator(task_data['parameters'])
+            if not is_valid:
+                errors.extend(f"Task {i}: {error}" for error in task_errors)
+        
+        return len(errors) == 0, errors
 
 # Convenience functions
 def load_config_from_file(file_path: str) -> ProcessingConfig:
@@ -215,21 +414,18 @@ def load_config_from_file(file_path: str) -> ProcessingConfig:
 
 def create_simple_download_config(url: str, output_filename: str) -> ProcessingConfig:
     """Create simple download configuration"""
-    manager = ConfigurationManager()
-    task = manager.create_download_task(url, output_filename)
-    return manager.create_config([task])
+    task = ConfigurationManager.create_download_task(url, output_filename)
+    return ConfigurationManager.create_config([task])
 
 def create_simple_split_config(source_file: str, output_name: str, 
                               max_size: str, output_extension: str = 'mp4') -> ProcessingConfig:
     """Create simple split configuration"""
-    manager = ConfigurationManager()
-    task = manager.create_split_task(source_file, output_name, output_extension, max_size)
-    return manager.create_config([task])
+    task = ConfigurationManager.create_split_task(source_file, output_name, output_extension, max_size)
+    return ConfigurationManager.create_config([task])
 
 def create_simple_clip_config(source_file: str, output_name: str,
                              intervals: List[Dict[str, Any]], 
                              output_extension: str = 'mp4') -> ProcessingConfig:
     """Create simple clip configuration"""
-    manager = ConfigurationManager()
-    task = manager.create_clip_task(source_file, output_name, output_extension, intervals)
-    return manager.create_config([task])
+    task = ConfigurationManager.create_clip_task(source_file, output_name, output_extension, intervals)
+    return ConfigurationManager.create_config([task])
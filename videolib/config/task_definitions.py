@@ -1,6 +1,7 @@
 """
 Task definitions and templates for common video processing operations
 """
+import os
 from typing import Dict, Any, List
 from .config_manager import TaskConfig, ProcessingConfig, ConfigurationManager
 
@@ -10,11 +11,9 @@ class TaskTemplates:
     @staticmethod
     def youtube_download_and_split(url: str, output_name: str, max_size: str = "2GB") -> ProcessingConfig:
         """Template: Download from URL and split by size"""
-        manager = ConfigurationManager()
-        
         tasks = [
-            manager.create_download_task(url, f"{output_name}_raw.mp4"),
-            manager.create_split_task(
+            ConfigurationManager.create_download_task(url, f"{output_name}_raw.mp4"),
+            ConfigurationManager.create_split_task(
                 source_file=f"{output_name}_raw.mp4",
                 output_name=f"{output_name}_part",
                 output_extension="mp4",
@@ -28,18 +27,16 @@ class TaskTemplates:
             "audio_codec": "copy"
         }
         
-        return manager.create_config(tasks, global_settings)
+        return ConfigurationManager.create_config(tasks, global_settings)
     
     @staticmethod
     def lecture_segmentation(source_file: str, chapter_intervals: List[Dict[str, Any]]) -> ProcessingConfig:
         """Template: Split lecture/presentation into chapters"""
-        manager = ConfigurationManager()
-        
         # Create base name from source file
-        base_name = source_file.rsplit('.', 1)[0] if '.' in source_file else source_file
+        base_name = os.path.splitext(source_file)[0]
         
         tasks = [
-            manager.create_clip_task(
+            ConfigurationManager.create_clip_task(
                 source_file=source_file,
                 output_name=f"{base_name}_chapter",
                 output_extension="mp4",
@@ -55,17 +52,15 @@ class TaskTemplates:
             "output_extension": "mp4"
         }
         
-        return manager.create_config(tasks, global_settings)
+        return ConfigurationManager.create_config(tasks, global_settings)
     
     @staticmethod
     def highlight_extraction(source_file: str, highlight_intervals: List[Dict[str, Any]]) -> ProcessingConfig:
         """Template: Extract highlights from video"""
-        manager = ConfigurationManager()
-        
-        base_name = source_file.rsplit('.', 1)[0] if '.' in source_file else source_file
+        base_name = os.path.splitext(source_file)[0]
         
         tasks = [
-            manager.create_clip_task(
+            ConfigurationManager.create_clip_task(
                 source_file=source_file,
                 output_name=f"{base_name}_highlight",
                 output_extension="mp4",
@@ -75,50 +70,60 @@ class TaskTemplates:
             )
         ]
         
-        return manager.create_config(tasks)
+        return ConfigurationManager.create_config(tasks)
     
     @staticmethod
     def batch_processing(source_files: List[str], operation_type: str, **kwargs) -> ProcessingConfig:
         """Template: Batch process multiple files"""
-        manager = ConfigurationManager()
-        tasks = []
-        
-        for i, source_file in enumerate(source_files):
-            base_name = source_file.rsplit('.', 1)[0] if '.' in source_file else source_file
-            
-            if operation_type == "split":
-                max_size = kwargs.get("max_size", "1GB")
-                output_name = kwargs.get("output_name", f"{base_name}_split")
-                
-                task = manager.create_split_task(
-                    source_file=source_file,
-                    output_name=output_name,
-                    output_extension="mp4",
-                    max_size=max_size
-                )
-                
-            elif operation_type == "clip":
-                intervals = kwargs.get("intervals", [{"start": "0", "end": "60"}])
-                output_name = kwargs.get("output_name", f"{base_name}_clip")
-                
-                task = manager.create_clip_task(
-                    source_file=source_file,
-                    output_name=output_name,
-                    output_extension="mp4",
-                    intervals=intervals
-                )
-            else:
-                continue
-            
-            tasks.append(task)
-        
         global_settings = {
             "output_extension": "mp4",
             "video_codec": "copy",
             "audio_codec": "copy"
         }
         
-        return manager.create_config(tasks, global_settings)
+        # Resolve the operation and its options once instead of per file
+        operation = _BATCH_OPERATIONS.get(operation_type)
+        if operation is None:
+            return ConfigurationManager.create_config([], global_settings)
+        
+        handler, name_suffix, option, make_default = operation
+        has_value, value = option in kwargs, kwargs.get(option)
+        has_name, output_name = "output_name" in kwargs, kwargs.get("output_name")
+        
+        # The default is built per task, so tasks never share a mutable default
+        splitext = os.path.splitext
+        tasks = [
+            handler(source_file,
+                    output_name if has_name else splitext(source_file)[0] + name_suffix,
+                    value if has_value else make_default())
+            for source_file in source_files
+        ]
+        
+        return ConfigurationManager.create_config(tasks, global_settings)
+
+def _batch_split_task(source_file: str, output_name: str, max_size: str) -> TaskConfig:
+    """Build a split task for batch_processing"""
+    return ConfigurationManager.create_split_task(
+        source_file=source_file,
+        output_name=output_name,
+        output_extension="mp4",
+        max_size=max_size
+    )
+
+def _batch_clip_task(source_file: str, output_name: str, intervals: List[Dict[str, Any]]) -> TaskConfig:
+    """Build a clip task for batch_processing"""
+    return ConfigurationManager.create_clip_task(
+        source_file=source_file,
+        output_name=output_name,
+        output_extension="mp4",
+        intervals=intervals
+    )
+
+# Per operation: (task builder, default output name suffix, option key, option default factory)
+_BATCH_OPERATIONS = {
+    "split": (_batch_split_task, "_split", "max_size", lambda: "1GB"),
+    "clip": (_batch_clip_task, "_clip", "intervals", lambda: [{"start": "0", "end": "60"}]),
+}
 
 class WorkflowBuilder:
     """Builder for creating complex workflows"""
@@ -1,18 +1,61 @@
 """
 Video processing core modules
 """
-from .ffmpeg_wrapper import FFmpegWrapper, MediaInfo, FFmpegResult
-from .video_processor import VideoProcessor, ProcessorConfig, create_video_processor
-from .downloader import VideoDownloader, DownloadOptions, DownloadResult
-from .splitter import VideoSplitter, SplitOptions, SplitResult
-from .clipper import VideoClipper, ClipOptions, ClipResult, ClipInterval
-from .gif_converter import VideoGifConverter, GifOptions, GifResult, GifInterval, AutoGifOptions
+import importlib
+import sys
 
-# Backward compatibility functions
-from .downloader import download_video
-from .splitter import split_video_by_size
-from .clipper import clip_video_segments
-from .gif_converter import create_gif_clips
+# Public names resolved lazily on first access (PEP 562), mapped to the
+# submodule that provides them
+_LAZY = {
+    'FFmpegWrapper': '.ffmpeg_wrapper',
+    'MediaInfo': '.ffmpeg_wrapper',
+    'FFmpegResult': '.ffmpeg_wrapper',
+    'VideoProcessor': '.video_processor',
+    'ProcessorConfig': '.video_processor',
+    'create_video_processor': '.video_processor',
+    'VideoDownloader': '.downloader',
+    'DownloadOptions': '.downloader',
+    'DownloadResult': '.downloader',
+    'VideoSplitter': '.splitter',
+    'SplitOptions': '.splitter',
+    'SplitResult': '.splitter',
+    'VideoClipper': '.clipper',
+    'ClipOptions': '.clipper',
+    'ClipResult': '.clipper',
+    'ClipInterval': '.clipper',
+    'VideoGifConverter': '.gif_converter',
+    'GifOptions': '.gif_converter',
+    'GifResult': '.gif_converter',
+    'GifInterval': '.gif_converter',
+    'AutoGifOptions': '.gif_converter',
+
+    # Backward compatibility functions
+    'download_video': '.downloader',
+    'split_video_by_size': '.splitter',
+    'clip_video_segments': '.clipper',
+    'create_gif_clips': '.gif_converter',
+}
+
+def _cached_import(module_name: str, item_name: str):
+    """Resolve item from an already-imported submodule, importing it if needed"""
+    module = sys.modules.get(__name__ + module_name)
+    if module is None:
+        module = importlib.import_module(module_name, __name__)
+    return getattr(module, item_name)
+
+def __getattr__(name: str):
+    """Import public names on first access and cache them on the package"""
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Later lookups hit the module dict directly and never reach __getattr__
+    value = _cached_import(module_name, name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
 __all__ = [
     # Main classes
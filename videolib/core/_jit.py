@@ -0,0 +1,63 @@
+"""
+Interval math for keyframe-aligned clipping, JIT-compiled when Numba is available
+"""
+import bisect
+from typing import List, Sequence, Tuple
+
+# NumPy for vectorized alignment (optional)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Numba for compiling the alignment loop (optional, requires NumPy)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _align_starts_jit(starts, keyframes):
+        """Snap each start back to the closest keyframe at or before it"""
+        aligned = starts.copy()
+        count = keyframes.shape[0]
+        for i in range(starts.shape[0]):
+            # Binary search for the first keyframe after the start
+            lo = 0
+            hi = count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if keyframes[mid] <= starts[i]:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo > 0:
+                aligned[i] = keyframes[lo - 1]
+        return aligned
+
+def align_intervals(intervals: Sequence[Tuple[float, float]],
+                    keyframes: Sequence[float]) -> List[Tuple[float, float]]:
+    """Move interval starts back to the preceding keyframe (keyframes must be sorted)"""
+    if not intervals or not keyframes:
+        return [(start, end) for start, end in intervals]
+    
+    if NUMPY_AVAILABLE:
+        bounds = np.asarray(intervals, dtype=np.float64).reshape(-1, 2)
+        key_times = np.asarray(keyframes, dtype=np.float64)
+        
+        if NUMBA_AVAILABLE:
+            starts = _align_starts_jit(np.ascontiguousarray(bounds[:, 0]), key_times)
+        else:
+            index = np.searchsorted(key_times, bounds[:, 0], side='right') - 1
+            starts = np.where(index >= 0, key_times[np.maximum(index, 0)], bounds[:, 0])
+        
+        return list(zip(starts.tolist(), bounds[:, 1].tolist()))
+    
+    aligned = []
+    for start, end in intervals:
+        index = bisect.bisect_right(keyframes, start) - 1
+        aligned.append((keyframes[index] if index >= 0 else start, end))
+    return aligned
@@ -1,14 +1,31 @@
 """
 Video clipper with OOP design  
 """
+import asyncio
+import os
 from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from ..utils import FileManager, FormatParser, InputValidator, ValidationError
-from .ffmpeg_wrapper import FFmpegWrapper, ClipCommand
+from ..utils.compat import DATACLASS_SLOTS
+from .ffmpeg_wrapper import FFmpegWrapper, FFmpegResult, ClipCommand, MultiClipCommand, get_default_wrapper
 
-@dataclass
+# NumPy for validating large interval lists in one pass (optional)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Below this many intervals the per-object checks are cheaper than building arrays
+NUMPY_MIN_INTERVALS = 64
+
+@dataclass(**DATACLASS_SLOTS)
 class ClipInterval:
-    """Represents a clip interval"""
+    """Represents a clip interval
+    
+    With stream copy ("copy" video and audio codecs) clips start at the
+    nearest keyframe at or before start_time rather than the exact frame.
+    """
     start_time: float
     end_time: float
     
@@ -18,7 +35,7 @@ class ClipInterval:
         if self.start_time < 0:
             raise ValueError("Start time cannot be negative")
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ClipOptions:
     """Clip operation options"""
     source_file: str
@@ -27,20 +44,21 @@ class ClipOptions:
     intervals: List[ClipInterval]
     video_codec: str = "copy"
     audio_codec: str = "copy"
+    max_parallel: Optional[int] = None  # Concurrent ffmpeg processes (default: CPU count)
+    known_duration: Optional[float] = None  # Source duration, skips probing when set
+    validate_duration: bool = True  # Check intervals against the source duration
+    align_to_keyframes: bool = False  # Move every clip start back to the preceding keyframe
+    verify_hashes: bool = False  # Record a SHA-256 digest of every created clip
+    timeout: Optional[float] = None  # Seconds before an ffmpeg process is stopped
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ClipResult:
     """Clip operation result"""
     success: bool
-    output_files: List[str] = None
-    failed_clips: List[Tuple[int, str]] = None
+    output_files: List[str] = field(default_factory=list)
+    failed_clips: List[Tuple[int, str]] = field(default_factory=list)
     error_message: Optional[str] = None
-
-    def __post_init__(self):
-        if self.output_files is None:
-            self.output_files = []
-        if self.failed_clips is None:
-            self.failed_clips = []
+    file_hashes: Dict[str, str] = field(default_factory=dict)
 
 class VideoClipper:
     """Video clipper class"""
@@ -56,30 +74,74 @@ class VideoClipper:
         except ValidationError as e:
             return ClipResult(success=False, error_message=str(e))
         
-        # Process each interval
-        output_files = []
-        failed_clips = []
-        
-        for i, interval in enumerate(options.intervals):
-            clip_result = self._create_single_clip(options, interval, i + 1)
-            
-            if clip_result.success:
-                output_files.extend(clip_result.output_files)
-            else:
-                failed_clips.append((i + 1, clip_result.error_message or "Unknown error"))
+        # Stream copies can share one ffmpeg process; re-encodes run in parallel
+        clips = self._plan_clips(options)
+        if self._can_batch(options):
+            output_files, failed_clips = self._create_clips_batched(options, clips)
+        else:
+            output_files, failed_clips = self._create_clips_parallel(options, clips)
         
         # Determine overall success
         success = len(output_files) > 0
+        file_hashes = FileManager.hash_files(output_files) if options.verify_hashes else {}
         
         return ClipResult(
             success=success,
             output_files=output_files,
-            failed_clips=failed_clips
+            failed_clips=failed_clips,
+            file_hashes=file_hashes
+        )
+    
+    async def create_clips_async(self, options: ClipOptions) -> ClipResult:
+        """Create video clips from intervals without blocking the event loop"""
+        # Validate inputs
+        try:
+            self._validate_options(options)
+        except ValidationError as e:
+            return ClipResult(success=False, error_message=str(e))
+        
+        clips = self._plan_clips(options)
+        if self._can_batch(options):
+            multi_cmd = self._build_multi_clip_command(options, clips)
+            result = await multi_cmd.execute_async(options.timeout)
+        else:
+            multi_cmd = result = None
+        
+        if result is not None and result.success:
+            output_files, failed_clips = self._collect_batched(multi_cmd, result)
+        else:
+            # After a failed batch, each clip runs alone so a failure is reported for that clip only
+            clip_cmds = self._build_clip_commands(options, clips)
+            limit = asyncio.Semaphore(options.max_parallel or os.cpu_count() or 1)
+            
+            async def run(clip_cmd: ClipCommand):
+                async with limit:
+                    return await clip_cmd.execute_async(options.timeout)
+            
+            results = await asyncio.gather(*(run(clip_cmd) for clip_cmd in clip_cmds))
+            output_files, failed_clips = self._collect_results(results)
+        
+        file_hashes = {}
+        if options.verify_hashes:
+            loop = asyncio.get_running_loop()
+            file_hashes = await loop.run_in_executor(None, FileManager.hash_files, output_files)
+        
+        return ClipResult(
+            success=len(output_files) > 0,
+            output_files=output_files,
+            failed_clips=failed_clips,
+            file_hashes=file_hashes
         )
     
+    @staticmethod
+    def _can_batch(options: ClipOptions) -> bool:
+        """Whether all intervals can be written by one stream-copy process"""
+        return options.video_codec == "copy" and options.audio_codec == "copy" and len(options.intervals) > 1
+    
     def _validate_options(self, options: ClipOptions) -> None:
         """Validate clip options"""
-        if not FileManager.get_file_size(options.source_file):
+        source_stat = FileManager.stat_or_none(options.source_file)
+        if source_stat is None or source_stat.st_size == 0:
             raise ValidationError(f"Source file not found: {options.source_file}")
         
         if not options.output_name.strip():
@@ -92,60 +154,153 @@ class VideoClipper:
             raise ValidationError("At least one interval is required")
         
         # Validate media has sufficient duration
-        probe_result = self.ffmpeg.probe_media(options.source_file)
-        if probe_result.success and probe_result.media_info.duration:
-            duration = probe_result.media_info.duration
-            
-            for i, interval in enumerate(options.intervals):
-                if interval.end_time > duration:
-                    raise ValidationError(
-                        f"Interval {i+1} end time ({interval.end_time}s) exceeds video duration ({duration}s)"
-                    )
-    
-    def _create_single_clip(self, options: ClipOptions, interval: ClipInterval, clip_number: int) -> ClipResult:
-        """Create a single clip"""
-        # Generate output filename
-        output_filename = f"{options.output_name}_{clip_number:03d}.{options.output_extension}"
-        
-        # Make filename unique if necessary
-        base_name = output_filename.rsplit('.', 1)[0]
-        extension = output_filename.rsplit('.', 1)[1]
-        unique_base = FileManager.get_unique_filename(base_name, extension)
-        output_path = f"{unique_base}.{extension}"
-        
-        # Execute clip command
-        clip_cmd = ClipCommand(
+        if options.known_duration is not None:
+            duration = options.known_duration
+        elif options.validate_duration:
+            probe_result = self.ffmpeg.probe_media(options.source_file, source_stat)
+            duration = probe_result.media_info.duration if probe_result.success else None
+        else:
+            duration = None
+        
+        # Single pass for the common case; locate offenders only on failure
+        if duration and max(interval.end_time for interval in options.intervals) > duration:
+            overruns = [(i, interval.end_time) for i, interval in enumerate(options.intervals, 1)
+                        if interval.end_time > duration]
+            if len(overruns) == 1:
+                i, end_time = overruns[0]
+                raise ValidationError(
+                    f"Interval {i} end time ({end_time}s) exceeds video duration ({duration}s)"
+                )
+            raise ValidationError(
+                f"Intervals {', '.join(str(i) for i, _ in overruns)} exceed video duration ({duration}s)"
+            )
+    
+    def _create_clips_parallel(self, options: ClipOptions,
+                               clips: List[Tuple[float, float, str]]) -> Tuple[List[str], List[Tuple[int, str]]]:
+        """Create clips concurrently, one ffmpeg process per interval"""
+        clip_cmds = self._build_clip_commands(options, clips)
+        results = self.ffmpeg.run_many(clip_cmds, options.max_parallel, options.timeout)
+        return self._collect_results(results)
+    
+    @staticmethod
+    def _collect_results(results: List[FFmpegResult]) -> Tuple[List[str], List[Tuple[int, str]]]:
+        """Split per-clip results into outputs and failures"""
+        output_files = []
+        failed_clips = []
+        for clip_number, result in enumerate(results, 1):
+            if result.success:
+                output_files.extend(result.output_files)
+            else:
+                failed_clips.append((clip_number, result.error_message or "Unknown error"))
+        
+        return output_files, failed_clips
+    
+    def _create_clips_batched(self, options: ClipOptions,
+                              clips: List[Tuple[float, float, str]]) -> Tuple[List[str], List[Tuple[int, str]]]:
+        """Create all clips with a single multi-output ffmpeg process"""
+        multi_cmd = self._build_multi_clip_command(options, clips)
+        result = multi_cmd.execute(options.timeout)
+        if result.success:
+            return self._collect_batched(multi_cmd, result)
+        
+        # One bad clip fails the whole process; rerun each clip alone so only it is reported
+        return self._create_clips_parallel(options, clips)
+    
+    def _plan_clips(self, options: ClipOptions) -> List[Tuple[float, float, str]]:
+        """(start_time, end_time, output_path) of every clip, aligned to keyframes when requested"""
+        bounds = [(interval.start_time, interval.end_time) for interval in options.intervals]
+        
+        if options.align_to_keyframes:
+            from ._jit import align_intervals
+            bounds = align_intervals(bounds, self.ffmpeg.get_keyframe_times(options.source_file))
+        
+        return [
+            (start_time, end_time, output_path)
+            for (start_time, end_time), output_path in zip(bounds, self._plan_output_paths(options))
+        ]
+    
+    def _build_multi_clip_command(self, options: ClipOptions,
+                                  clips: List[Tuple[float, float, str]]) -> MultiClipCommand:
+        """Build the multi-output command covering every clip"""
+        return MultiClipCommand(
             self.ffmpeg,
             options.source_file,
-            output_path,
-            interval.start_time,
-            interval.end_time,
+            clips,
             options.video_codec,
             options.audio_codec
         )
+    
+    def _build_clip_commands(self, options: ClipOptions,
+                             clips: List[Tuple[float, float, str]]) -> List[ClipCommand]:
+        """Build one single-clip command per clip"""
+        return [
+            self._build_clip_command(options, start_time, end_time, output_path)
+            for start_time, end_time, output_path in clips
+        ]
+    
+    @staticmethod
+    def _collect_batched(multi_cmd: MultiClipCommand,
+                         result: FFmpegResult) -> Tuple[List[str], List[Tuple[int, str]]]:
+        """Split a multi-output result into per-clip outputs and failures"""
+        created = set(result.output_files)
         
-        result = clip_cmd.execute()
+        output_files = []
+        failed_clips = []
+        for clip_number, (_, _, output_path) in enumerate(multi_cmd.clips, 1):
+            if output_path in created:
+                output_files.append(output_path)
+            else:
+                failed_clips.append((clip_number, result.error_message or "Output file was not created"))
         
-        if result.success:
-            return ClipResult(success=True, output_files=[output_path])
-        else:
-            return ClipResult(success=False, error_message=result.error_message)
+        return output_files, failed_clips
+    
+    @staticmethod
+    def _plan_output_paths(options: ClipOptions) -> List[str]:
+        """Assign a unique output path to every clip up front"""
+        # Generate output filenames
+        base_names = [f"{options.output_name}_{clip_number:03d}"
+                      for clip_number in range(1, len(options.intervals) + 1)]
+        
+        # Make filenames unique if necessary (one directory scan plus a stat per clip)
+        extension = options.output_extension
+        unique_bases = FileManager.get_unique_filenames(base_names, extension)
+        return [f"{unique_base}.{extension}" for unique_base in unique_bases]
+    
+    def _build_clip_command(self, options: ClipOptions, start_time: float, end_time: float,
+                            output_path: str) -> ClipCommand:
+        """Build the command for a single clip"""
+        return ClipCommand(
+            self.ffmpeg,
+            options.source_file,
+            output_path,
+            start_time,
+            end_time,
+            options.video_codec,
+            options.audio_codec
+        )
 
 # Convenience functions for backward compatibility  
 def clip_video_segments(source_file: str, output_name: str, output_extension: str,
                        video_codec: str, audio_codec: str, 
-                       intervals: List[Tuple[float, float]]) -> Dict[str, Any]:
+                       intervals: List[Tuple[float, float]],
+                       duration: Optional[float] = None) -> Dict[str, Any]:
     """Create video clips - backward compatible function"""
-    clipper = VideoClipper()
+    clipper = VideoClipper(get_default_wrapper())
     
     # Convert interval tuples to ClipInterval objects
-    clip_intervals = []
-    for start, end in intervals:
-        try:
-            clip_intervals.append(ClipInterval(start_time=start, end_time=end))
-        except ValueError:
-            # Skip invalid intervals
-            continue
+    if NUMPY_AVAILABLE and len(intervals) >= NUMPY_MIN_INTERVALS:
+        # Drop invalid intervals with one vectorized check, negated like ClipInterval's so NaN passes too
+        bounds = np.asarray(intervals, dtype=np.float64).reshape(-1, 2)
+        valid = bounds[~(bounds[:, 0] >= bounds[:, 1]) & ~(bounds[:, 0] < 0)]
+        clip_intervals = [ClipInterval(start_time=start, end_time=end) for start, end in valid.tolist()]
+    else:
+        clip_intervals = []
+        for start, end in intervals:
+            try:
+                clip_intervals.append(ClipInterval(start_time=start, end_time=end))
+            except ValueError:
+                # Skip invalid intervals
+                continue
     
     options = ClipOptions(
         source_file=source_file,
@@ -153,7 +308,8 @@ def clip_video_segments(source_file: str, output_name: str, output_extension: st
         output_extension=output_extension,
         intervals=clip_intervals,
         video_codec=video_codec,
-        audio_codec=audio_codec
+        audio_codec=audio_codec,
+        known_duration=duration
     )
     
     result = clipper.create_clips(options)
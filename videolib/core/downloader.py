@@ -1,19 +1,21 @@
 """
 Video downloader with OOP design
 """
+import os
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 from ..utils import FileManager, FormatParser, InputValidator, ValidationError
-from .ffmpeg_wrapper import FFmpegWrapper, DownloadCommand, FFmpegResult
+from ..utils.compat import DATACLASS_SLOTS
+from .ffmpeg_wrapper import FFmpegWrapper, DownloadCommand, FFmpegResult, get_default_wrapper
 
-@dataclass  
+@dataclass(**DATACLASS_SLOTS)
 class DownloadOptions:
     """Download operation options"""
     url: str
     output_path: str
     overwrite: bool = True
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class DownloadResult:
     """Download operation result"""
     success: bool
@@ -69,9 +71,9 @@ class VideoDownloader:
         output_path = options.output_path
         
         # If file exists and overwrite is False, make unique
-        if not options.overwrite and FileManager.get_file_size(output_path) is not None:
-            base_name = output_path.rsplit('.', 1)[0] if '.' in output_path else output_path
-            extension = output_path.rsplit('.', 1)[1] if '.' in output_path else ''
+        if not options.overwrite and FileManager.stat_or_none(output_path) is not None:
+            base_name, dot_extension = os.path.splitext(output_path)
+            extension = dot_extension[1:]
             
             output_path = FileManager.get_unique_filename(base_name, extension)
             if extension:
@@ -82,7 +84,7 @@ class VideoDownloader:
 # Convenience functions for backward compatibility
 def download_video(url: str, output_filename: str) -> Dict[str, Any]:
     """Download video - backward compatible function"""
-    downloader = VideoDownloader()
+    downloader = VideoDownloader(get_default_wrapper())
     options = DownloadOptions(url=url, output_path=output_filename)
     result = downloader.download(options)
     
@@ -1,15 +1,61 @@
 """
 FFmpeg wrapper module - provides OOP interface to FFmpeg operations
 """
-import glob
+import asyncio
+import hashlib
+import itertools
 import os
 import json
+import tempfile
+import math
+import re
+import shutil
 import subprocess
-from typing import Optional, Dict, Any, Tuple, List
-from dataclasses import dataclass
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Tuple, List, Callable, Iterable, AsyncIterator
+from dataclasses import dataclass, field, asdict
 from abc import ABC, abstractmethod
+from ..utils.compat import DATACLASS_SLOTS
+from ..utils.file_utils import _ensure_directory, _forget_directory
 
-@dataclass
+# orjson for faster parsing of full ffprobe JSON output (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# PyAV for remuxing stream-copy clips in-process instead of launching ffmpeg (optional)
+try:
+    import av
+    PYAV_AVAILABLE = True
+except ImportError:
+    PYAV_AVAILABLE = False
+
+# Maximum number of probe results kept per FFmpegWrapper
+PROBE_CACHE_SIZE = 128
+
+# Only the ffprobe fields MediaInfo needs
+PROBE_ENTRIES = "format=duration,format_name,bit_rate:stream=codec_type,codec_name,width,height"
+
+# Executables already found to work in this process
+_VALIDATED_EXECUTABLES: set = set()
+
+# key=value lines written by ffmpeg's -progress option
+_PROGRESS_LINE_RE = re.compile(rb"^(\w+)=(\S*)$")
+
+# Input options that skip ffmpeg's stream analysis of the first seconds of input
+FAST_INPUT_PROBE_ARGS = ("-analyzeduration", "0", "-probesize", "32k")
+
+# Trailing stderr lines kept for error messages
+STDERR_TAIL_LINES = 200
+
+# Seconds a terminated ffmpeg gets to exit before it is killed
+TERMINATE_GRACE_SECONDS = 2.0
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class MediaInfo:
     """Media information data structure"""
     duration: Optional[float] = None
@@ -21,78 +67,414 @@ class MediaInfo:
     height: Optional[int] = None
     bitrate: Optional[int] = None
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class FFmpegResult:
     """Result of FFmpeg operation"""
     success: bool
     error_message: Optional[str] = None
-    output_files: List[str] = None
+    output_files: List[str] = field(default_factory=list)
     media_info: Optional[MediaInfo] = None
 
-    def __post_init__(self):
-        if self.output_files is None:
-            self.output_files = []
-
 class FFmpegCommand(ABC):
     """Abstract base class for FFmpeg commands"""
     
+    # Prefix for ffmpeg failure messages
+    error_prefix = "FFmpeg failed"
+    
     @abstractmethod
     def build_command(self) -> List[str]:
         """Build the FFmpeg command as list of strings"""
         pass
     
-    @abstractmethod
-    def execute(self) -> FFmpegResult:
-        """Execute the command and return result"""
-        pass
+    def output_dirs(self) -> List[str]:
+        """Directories that must exist before the command runs"""
+        return [os.path.dirname(self.output_path)]
+    
+    def collect_result(self) -> FFmpegResult:
+        """Build the result after ffmpeg exited successfully"""
+        # ffmpeg only exits cleanly after the muxer finalized the output file
+        return FFmpegResult(success=True, output_files=[self.output_path])
+    
+    def _prepare_output_dirs(self) -> None:
+        """Ensure output directories exist"""
+        for out_dir in self.output_dirs():
+            if out_dir:
+                _ensure_directory(out_dir)
+    
+    def _forget_output_dirs(self) -> bool:
+        """Drop cached output directories, returning whether one of them has since disappeared"""
+        removed = False
+        for out_dir in self.output_dirs():
+            if out_dir and _forget_directory(out_dir) and not os.path.isdir(out_dir):
+                removed = True
+        return removed
+    
+    def execute(self, timeout: Optional[float] = None,
+                progress: Optional[Callable[[float], None]] = None) -> FFmpegResult:
+        """Execute the command and return result
+        
+        ffmpeg is stopped once timeout seconds have passed. When progress is
+        given it is called with the seconds of output written so far.
+        """
+        result = self._run(timeout, progress)
+        if not result.success and self._forget_output_dirs():
+            # An output directory was removed after it was cached; recreate it and retry once
+            result = self._run(timeout, progress)
+        return result
+    
+    def _run(self, timeout: Optional[float],
+             progress: Optional[Callable[[float], None]]) -> FFmpegResult:
+        """Run ffmpeg once"""
+        self._prepare_output_dirs()
+        cmd = self.build_command()
+        if progress is not None:
+            # Global options, so they go right after the executable
+            cmd[1:1] = ["-progress", "pipe:2", "-nostats"]
+        
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except Exception as e:
+            return FFmpegResult(success=False, error_message=str(e))
+        
+        timed_out = threading.Event()
+        timer = None
+        if timeout is not None:
+            def abort():
+                # Mark the timeout before signalling, so the waiting thread sees it once ffmpeg dies
+                if proc.poll() is None:
+                    timed_out.set()
+                    self._stop_process(proc)
+            timer = threading.Timer(timeout, abort)
+            timer.daemon = True
+            timer.start()
+        
+        try:
+            # stderr stays as bytes; it is only decoded when reporting a failure
+            stderr = self._read_stderr(proc.stderr, progress)
+            returncode = proc.wait()
+        except Exception as e:
+            self._stop_process(proc)
+            return FFmpegResult(success=False, error_message=str(e))
+        finally:
+            if timer is not None:
+                timer.cancel()
+            proc.stderr.close()
+        
+        # ffmpeg may still finish cleanly between the timer firing and the signal
+        if timed_out.is_set() and returncode != 0:
+            return FFmpegResult(success=False, error_message=f"{self.error_prefix}: timed out after {timeout}s")
+        if returncode != 0:
+            return FFmpegResult(
+                success=False,
+                error_message=f"{self.error_prefix}: {stderr.decode('utf-8', 'replace')}"
+            )
+        return self.collect_result()
+    
+    @staticmethod
+    def _read_stderr(stream, progress: Optional[Callable[[float], None]]) -> bytes:
+        """Read stderr until ffmpeg exits, passing progress updates to the callback
+        
+        Only the last STDERR_TAIL_LINES messages are kept.
+        """
+        messages: "deque[bytes]" = deque(maxlen=STDERR_TAIL_LINES)
+        if progress is None:
+            messages.extend(stream)
+            return b"".join(messages)
+        
+        out_time = None
+        for line in stream:
+            match = _PROGRESS_LINE_RE.match(line.rstrip())
+            if match is None:
+                messages.append(line)
+                continue
+            
+            key, value = match.groups()
+            # out_time_ms is in microseconds too; older ffmpeg only writes that one
+            if key in (b"out_time_us", b"out_time_ms"):
+                try:
+                    out_time = int(value) / 1_000_000
+                except ValueError:
+                    pass
+            elif key == b"progress" and out_time is not None:
+                progress(out_time)
+        
+        return b"".join(messages)
+    
+    @staticmethod
+    def _stop_process(proc: subprocess.Popen) -> None:
+        """Terminate ffmpeg, killing it if it does not exit in time"""
+        if proc.poll() is not None:
+            return
+        proc.terminate()
+        try:
+            proc.wait(TERMINATE_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    
+    @staticmethod
+    async def _read_stderr_async(proc: asyncio.subprocess.Process) -> bytes:
+        """Read stderr until ffmpeg exits, keeping the last STDERR_TAIL_LINES messages"""
+        messages: "deque[bytes]" = deque(maxlen=STDERR_TAIL_LINES)
+        async for line in proc.stderr:
+            messages.append(line)
+        await proc.wait()
+        return b"".join(messages)
+    
+    async def execute_async(self, timeout: Optional[float] = None) -> FFmpegResult:
+        """Execute the command without blocking the event loop"""
+        result = await self._run_async(timeout)
+        if not result.success and self._forget_output_dirs():
+            # An output directory was removed after it was cached; recreate it and retry once
+            result = await self._run_async(timeout)
+        return result
+    
+    async def _run_async(self, timeout: Optional[float]) -> FFmpegResult:
+        """Run ffmpeg once without blocking the event loop"""
+        self._prepare_output_dirs()
+        cmd = self.build_command()
+        
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stderr = await asyncio.wait_for(self._read_stderr_async(proc), timeout)
+            except asyncio.TimeoutError:
+                proc.terminate()
+                try:
+                    await asyncio.wait_for(proc.wait(), TERMINATE_GRACE_SECONDS)
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+                return FFmpegResult(success=False, error_message=f"{self.error_prefix}: timed out after {timeout}s")
+            except asyncio.CancelledError:
+                # Do not leave ffmpeg running for an abandoned result
+                if proc.returncode is None:
+                    proc.kill()
+                raise
+            if proc.returncode != 0:
+                return FFmpegResult(
+                    success=False,
+                    error_message=f"{self.error_prefix}: {stderr.decode(errors='replace')}"
+                )
+            return self.collect_result()
+        except Exception as e:
+            return FFmpegResult(success=False, error_message=str(e))
 
 class FFmpegWrapper:
     """Main FFmpeg wrapper class"""
     
-    def __init__(self, ffmpeg_path: str = "ffmpeg", ffprobe_path: str = "ffprobe"):
+    def __init__(self, ffmpeg_path: str = "ffmpeg", ffprobe_path: str = "ffprobe",
+                 compact_probe: bool = True, fast_input_probe: bool = False,
+                 probe_cache_dir: Optional[str] = None):
         self.ffmpeg_path = ffmpeg_path
         self.ffprobe_path = ffprobe_path
+        self.compact_probe = compact_probe  # False requests full JSON format/stream data
+        self.probe_cache_dir = probe_cache_dir  # Directory persisting probe results across processes
+        # Shared argv prefix: overwrite without asking, only log errors
+        self.base_args = (ffmpeg_path, "-y", "-loglevel", "error")
+        # Input options for download/segment/clip; a short probe suits containers with a
+        # header index (mp4, mkv) but can miss late-starting streams in raw/ts inputs
+        self.input_args = FAST_INPUT_PROBE_ARGS if fast_input_probe else ()
+        self._probe_cache: "OrderedDict[Tuple[str, int, int], FFmpegResult]" = OrderedDict()
+        self._probe_cache_lock = threading.Lock()  # Probes run from worker threads during splits
         self._validate_executables()
     
     def _validate_executables(self) -> None:
         """Validate FFmpeg and FFprobe are available"""
         for exe in [self.ffmpeg_path, self.ffprobe_path]:
+            if exe in _VALIDATED_EXECUTABLES:
+                continue
+            
+            # A PATH lookup avoids starting a process; run -version only if it fails
+            if shutil.which(exe) is None:
+                try:
+                    subprocess.run([exe, "-version"], 
+                                 stdout=subprocess.DEVNULL, 
+                                 stderr=subprocess.DEVNULL, 
+                                 check=True)
+                except (subprocess.CalledProcessError, OSError):
+                    raise RuntimeError(f"{exe} executable not found or not working")
+            
+            _VALIDATED_EXECUTABLES.add(exe)
+    
+    def probe_media(self, file_path: str, st: Optional[os.stat_result] = None,
+                    hint: Optional[MediaInfo] = None, refresh: bool = False) -> FFmpegResult:
+        """Probe media file for information
+        
+        Successful results are cached per (path, mtime, size), so repeated
+        probes of an unchanged file do not launch ffprobe again; with
+        probe_cache_dir set they are also kept on disk for other processes.
+        refresh ignores both caches. Callers that already stat'ed the file can
+        pass the result as st, and callers that already know the media
+        information can pass it as hint to skip probing.
+        """
+        if hint is not None:
+            return FFmpegResult(success=True, media_info=hint)
+        
+        if st is None:
             try:
-                subprocess.run([exe, "-version"], 
-                             stdout=subprocess.DEVNULL, 
-                             stderr=subprocess.DEVNULL, 
-                             check=True)
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                raise RuntimeError(f"{exe} executable not found or not working")
-    
-    def probe_media(self, file_path: str) -> FFmpegResult:
-        """Probe media file for information"""
-        if not os.path.exists(file_path):
-            return FFmpegResult(success=False, error_message=f"File not found: {file_path}")
+                st = os.stat(file_path)
+            except OSError:
+                return FFmpegResult(success=False, error_message=f"File not found: {file_path}")
         
-        cmd = [
-            self.ffprobe_path, "-v", "error", "-print_format", "json",
-            "-show_format", "-show_streams", file_path
-        ]
+        key = (os.path.realpath(file_path), st.st_mtime_ns, st.st_size)
+        if not refresh:
+            with self._probe_cache_lock:
+                cached = self._probe_cache.get(key)
+                if cached is not None:
+                    self._probe_cache.move_to_end(key)
+                    return cached
+        
+        result = None
+        if self.probe_cache_dir and not refresh:
+            result = self._load_stored_probe(key)
+        if result is None:
+            result = self._run_probe(file_path, st.st_size)
+            if result.success and self.probe_cache_dir:
+                self._store_probe(key, result.media_info)
+        
+        if result.success:
+            with self._probe_cache_lock:
+                self._probe_cache[key] = result
+                self._probe_cache.move_to_end(key)
+                if len(self._probe_cache) > PROBE_CACHE_SIZE:
+                    self._probe_cache.popitem(last=False)
+        
+        return result
+    
+    def _stored_probe_path(self, key: Tuple[str, int, int]) -> str:
+        """Path of the on-disk probe result for a cache key"""
+        digest = hashlib.sha1("\0".join(map(str, key)).encode("utf-8", "surrogateescape")).hexdigest()
+        return os.path.join(self.probe_cache_dir, digest + ".json")
+    
+    def _load_stored_probe(self, key: Tuple[str, int, int]) -> Optional[FFmpegResult]:
+        """Read a probe result persisted by any process, if present"""
+        try:
+            with open(self._stored_probe_path(key), "rb") as f:
+                raw = f.read()
+            fields = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+            return FFmpegResult(success=True, media_info=MediaInfo(**fields))
+        except (OSError, ValueError, TypeError):
+            return None
+    
+    def _store_probe(self, key: Tuple[str, int, int], media_info: MediaInfo) -> None:
+        """Persist a probe result; the file appears atomically or not at all"""
+        fields = asdict(media_info)
+        raw = orjson.dumps(fields) if ORJSON_AVAILABLE else json.dumps(fields).encode("utf-8")
+        try:
+            os.makedirs(self.probe_cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.probe_cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(raw)
+                os.replace(temp_path, self._stored_probe_path(key))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            # The disk cache is an optimization; probing already succeeded
+            pass
+    
+    def clear_probe_cache(self) -> None:
+        """Forget all cached probe results"""
+        with self._probe_cache_lock:
+            self._probe_cache.clear()
+    
+    def _run_probe(self, file_path: str, size_bytes: Optional[int] = None) -> FFmpegResult:
+        """Run FFprobe on a file and parse its output"""
+        if PYAV_AVAILABLE:
+            # Read the container in-process; fall back to ffprobe if PyAV cannot
+            data = self._probe_data_in_process(file_path)
+            if data is not None:
+                return FFmpegResult(success=True, media_info=self._parse_media_info(data, file_path, size_bytes))
+        
+        if self.compact_probe:
+            cmd = [
+                self.ffprobe_path, "-v", "error", "-of", "default",
+                "-show_entries", PROBE_ENTRIES, file_path
+            ]
+        else:
+            cmd = [
+                self.ffprobe_path, "-v", "error", "-print_format", "json",
+                "-show_format", "-show_streams", file_path
+            ]
         
         try:
-            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
-                                text=True, check=True)
-            data = json.loads(proc.stdout)
+            # Raw bytes: both JSON parsers take them directly without a text-mode decode
+            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+            if self.compact_probe:
+                data = self._parse_compact_output(proc.stdout.decode("utf-8", "replace"))
+            elif ORJSON_AVAILABLE:
+                data = orjson.loads(proc.stdout)
+            else:
+                data = json.loads(proc.stdout)
             
             # Parse media information
-            media_info = self._parse_media_info(data, file_path)
+            media_info = self._parse_media_info(data, file_path, size_bytes)
             
             return FFmpegResult(success=True, media_info=media_info)
             
         except subprocess.CalledProcessError as e:
-            return FFmpegResult(success=False, error_message=f"FFprobe failed: {e.stderr}")
-        except json.JSONDecodeError as e:
+            stderr = e.stderr.decode("utf-8", "replace") if e.stderr else ""
+            return FFmpegResult(success=False, error_message=f"FFprobe failed: {stderr}")
+        except json.JSONDecodeError as e:  # Also raised by orjson
             return FFmpegResult(success=False, error_message=f"JSON decode error: {e}")
         except Exception as e:
             return FFmpegResult(success=False, error_message=str(e))
     
-    def _parse_media_info(self, data: Dict[str, Any], file_path: str) -> MediaInfo:
+    @staticmethod
+    def _probe_data_in_process(file_path: str) -> Optional[Dict[str, Any]]:
+        """Read format/stream data with PyAV in the ffprobe JSON data layout (requires PyAV)"""
+        try:
+            with av.open(file_path) as container:
+                fmt = {"format_name": container.format.name}
+                if container.duration is not None:
+                    fmt["duration"] = container.duration / av.time_base
+                if container.bit_rate:
+                    fmt["bit_rate"] = container.bit_rate
+                
+                streams = []
+                for stream in container.streams:
+                    codec_context = stream.codec_context
+                    streams.append({
+                        "codec_type": stream.type,
+                        "codec_name": codec_context.name if codec_context is not None else None,
+                        "width": getattr(codec_context, "width", None),
+                        "height": getattr(codec_context, "height", None),
+                    })
+        except Exception:
+            return None
+        
+        return {"format": fmt, "streams": streams}
+    
+    @staticmethod
+    def _parse_compact_output(output: str) -> Dict[str, Any]:
+        """Parse ffprobe key=value sections into the JSON data layout"""
+        fmt: Dict[str, Any] = {}
+        streams: List[Dict[str, Any]] = []
+        section: Optional[Dict[str, Any]] = None
+        
+        for line in output.splitlines():
+            if line == "[STREAM]":
+                section = {}
+                streams.append(section)
+            elif line == "[FORMAT]":
+                section = fmt
+            elif line.startswith("[/"):
+                section = None
+            elif section is not None and "=" in line:
+                key, value = line.split("=", 1)
+                if value == "N/A":
+                    continue
+                if key in ("width", "height"):
+                    value = int(value) if value.isdigit() else None
+                section[key] = value
+        
+        return {"format": fmt, "streams": streams}
+    
+    def _parse_media_info(self, data: Dict[str, Any], file_path: str,
+                          size_bytes: Optional[int] = None) -> MediaInfo:
         """Parse FFprobe JSON data into MediaInfo"""
         fmt = data.get("format", {})
         streams = data.get("streams", [])
@@ -104,26 +486,24 @@ class FFmpegWrapper:
         except (ValueError, TypeError):
             pass
         
-        # Parse codecs and stream info
-        video_codec = None
-        audio_codec = None
-        width = None
-        height = None
-        
-        for stream in streams:
-            if stream.get("codec_type") == "video" and not video_codec:
-                video_codec = stream.get("codec_name")
-                width = stream.get("width")
-                height = stream.get("height")
-            elif stream.get("codec_type") == "audio" and not audio_codec:
-                audio_codec = stream.get("codec_name")
-        
-        # Get file size
-        size_bytes = None
-        try:
-            size_bytes = os.path.getsize(file_path)
-        except OSError:
-            pass
+        # Parse codecs and stream info from the first stream of each kind
+        first_video = next((s for s in streams if s.get("codec_type") == "video"), None)
+        first_audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+        
+        if first_video is not None:
+            video_codec = first_video.get("codec_name")
+            width = first_video.get("width")
+            height = first_video.get("height")
+        else:
+            video_codec = width = height = None
+        audio_codec = first_audio.get("codec_name") if first_audio is not None else None
+        
+        # Get file size unless the caller already knows it
+        if size_bytes is None:
+            try:
+                size_bytes = os.path.getsize(file_path)
+            except OSError:
+                pass
         
         # Parse bitrate
         bitrate = None
@@ -143,12 +523,74 @@ class FFmpegWrapper:
             bitrate=bitrate
         )
     
+    def get_keyframe_times(self, file_path: str) -> List[float]:
+        """Get sorted keyframe timestamps of the first video stream"""
+        cmd = [
+            self.ffprobe_path, "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", file_path
+        ]
+        
+        try:
+            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+        except (subprocess.CalledProcessError, OSError):
+            return []
+        
+        # float() parses the ASCII timestamps straight from bytes
+        keyframes = []
+        for line in proc.stdout.splitlines():
+            pts_time, _, flags = line.partition(b",")
+            if flags.startswith(b"K") and pts_time not in (b"", b"N/A"):
+                keyframes.append(float(pts_time))
+        
+        keyframes.sort()
+        return keyframes
+    
     def get_duration_seconds(self, file_path: str) -> Optional[float]:
         """Get duration in seconds (convenience method)"""
         result = self.probe_media(file_path)
         if result.success and result.media_info:
             return result.media_info.duration
         return None
+    
+    def run_many(self, commands: List["FFmpegCommand"], max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None) -> List[FFmpegResult]:
+        """Run independent commands concurrently, returning results in command order"""
+        if not commands:
+            return []
+        
+        # Threads only wait on ffmpeg processes, so they add no GIL contention
+        max_workers = min(len(commands), max_workers or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda command: command.execute(timeout), commands))
+    
+    async def iter_results(self, commands: Iterable["FFmpegCommand"], lookahead: int = 2,
+                           timeout: Optional[float] = None) -> AsyncIterator[FFmpegResult]:
+        """Yield command results in order while the next commands already run
+        
+        Up to lookahead commands run ahead of the one being awaited, so the
+        caller can consume result k while k+1 and k+2 are being produced.
+        Commands still pending when iteration stops are cancelled.
+        """
+        pending: "deque[asyncio.Future]" = deque()
+        try:
+            for command in commands:
+                pending.append(asyncio.ensure_future(command.execute_async(timeout)))
+                if len(pending) > lookahead:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+_DEFAULT_WRAPPER: Optional[FFmpegWrapper] = None
+
+def get_default_wrapper() -> FFmpegWrapper:
+    """Get the shared wrapper for default FFmpeg paths"""
+    global _DEFAULT_WRAPPER
+    if _DEFAULT_WRAPPER is None:
+        _DEFAULT_WRAPPER = FFmpegWrapper()
+    return _DEFAULT_WRAPPER
 
 class DownloadCommand(FFmpegCommand):
     """FFmpeg download command"""
@@ -161,94 +603,97 @@ class DownloadCommand(FFmpegCommand):
     def build_command(self) -> List[str]:
         """Build download command"""
         return [
-            self.wrapper.ffmpeg_path,
-            "-y",  # overwrite without asking
+            *self.wrapper.base_args,
+            *self.wrapper.input_args,
             "-i", self.url,
             "-c", "copy",  # stream copy
             self.output_path
         ]
-    
-    def execute(self) -> FFmpegResult:
-        """Execute download command"""
-        # Ensure output directory exists
-        out_dir = os.path.dirname(self.output_path)
-        if out_dir:
-            os.makedirs(out_dir, exist_ok=True)
-        
-        cmd = self.build_command()
-        
-        try:
-            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
-            
-            # Verify output file exists
-            if os.path.exists(self.output_path):
-                return FFmpegResult(success=True, output_files=[self.output_path])
-            else:
-                return FFmpegResult(success=False, error_message="Output file was not created")
-                
-        except subprocess.CalledProcessError as e:
-            return FFmpegResult(success=False, error_message=f"FFmpeg failed: {e.stderr}")
-        except Exception as e:
-            return FFmpegResult(success=False, error_message=str(e))
 
 class SegmentCommand(FFmpegCommand):
     """FFmpeg segment command"""
     
-    def __init__(self, wrapper: FFmpegWrapper, input_path: str, output_pattern: str, pattern_keyword: str, segment_duration: float):
+    error_prefix = "FFmpeg segmentation failed"
+    
+    def __init__(self, wrapper: FFmpegWrapper, input_path: str, output_pattern: str, pattern_keyword: str, segment_duration: float,
+                 input_duration: Optional[float] = None):
         self.wrapper = wrapper
         self.input_path = input_path
         self.output_pattern = output_pattern
         self.pattern_keyword = pattern_keyword
         self.segment_duration = segment_duration
+        self.input_duration = input_duration  # Known source duration, lets results skip the directory scan
+        # Split the pattern once for matching the written segment names
+        self._output_dir = os.path.dirname(output_pattern) or "."
+        self._prefix, self._suffix = os.path.basename(output_pattern).split(pattern_keyword, 1)
     
     def build_command(self) -> List[str]:
         """Build segment command"""
         return [
-            self.wrapper.ffmpeg_path,
-            "-y",
+            *self.wrapper.base_args,
+            *self.wrapper.input_args,
             "-i", self.input_path,
             "-c", "copy",
             "-map", "0",
             "-f", "segment",
-            "-segment_time", f"{self.segment_duration:.3f}",
+            "-segment_time", format(self.segment_duration, ".3f"),
             "-reset_timestamps", "1",
             self.output_pattern
         ]
     
-    def execute(self) -> FFmpegResult:
-        """Execute segment command"""
-        # Ensure output directory exists
-        out_dir = os.path.dirname(self.output_pattern)
-        if out_dir:
-            os.makedirs(out_dir, exist_ok=True)
+    def output_dirs(self) -> List[str]:
+        """Directories that must exist before the command runs"""
+        return [os.path.dirname(self.output_pattern)]
+    
+    def expected_segment_count(self) -> Optional[int]:
+        """Number of segments the input duration implies, if it is known"""
+        if not self.input_duration or self.segment_duration <= 0:
+            return None
+        return math.ceil(self.input_duration / self.segment_duration)
+    
+    def collect_result(self) -> FFmpegResult:
+        """Find created segments, by number when the count is predictable"""
+        expected = self.expected_segment_count()
+        if expected is not None:
+            # Segments are numbered from 0 without gaps; keyframe cuts can shift the count by one
+            segments = []
+            for number in itertools.count():
+                path = self.output_pattern.replace(self.pattern_keyword, self.pattern_keyword % number)
+                if not os.path.exists(path):
+                    break
+                segments.append(path)
+            if len(segments) >= expected - 1:
+                return FFmpegResult(success=True, output_files=segments)
         
-        cmd = self.build_command()
+        return self._scan_segments()
+    
+    def _scan_segments(self) -> FFmpegResult:
+        """Find created segments in one directory pass"""
+        prefix, suffix = self._prefix, self._suffix
+        start, min_length = len(prefix), len(prefix) + len(suffix) + 1
         
+        numbered = []
         try:
-            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
-            
-            # Find created segments
-            output_dir = os.path.dirname(self.output_pattern) or "."
-            glob_pattern = self.output_pattern.replace(self.pattern_keyword, '*')
-
-            segments = []
-            try:
-                segments = glob.glob(glob_pattern)
-                segments = [os.path.join(output_dir, os.path.basename(f)) for f in segments]
-                segments.sort()
-            except OSError:
-                pass
-            
-            return FFmpegResult(success=True, output_files=segments)
-            
-        except subprocess.CalledProcessError as e:
-            return FFmpegResult(success=False, error_message=f"FFmpeg segmentation failed: {e.stderr}")
-        except Exception as e:
-            return FFmpegResult(success=False, error_message=str(e))
+            with os.scandir(self._output_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if len(name) < min_length or not name.startswith(prefix) or not name.endswith(suffix):
+                        continue
+                    number = name[start:len(name) - len(suffix)]
+                    if number.isdigit():
+                        numbered.append((int(number), entry.path))
+        except OSError:
+            pass
+        
+        # Numeric order keeps segment 1000 after 999
+        numbered.sort()
+        return FFmpegResult(success=True, output_files=[path for _, path in numbered])
 
 class ClipCommand(FFmpegCommand):
     """FFmpeg clip command"""
     
+    error_prefix = "FFmpeg clip failed"
+    
     def __init__(self, wrapper: FFmpegWrapper, input_path: str, output_path: str, 
                  start_time: float, end_time: float, video_codec: str = "copy", audio_codec: str = "copy"):
         self.wrapper = wrapper
@@ -261,40 +706,180 @@ class ClipCommand(FFmpegCommand):
     
     def build_command(self) -> List[str]:
         """Build clip command"""
-        return [
-            self.wrapper.ffmpeg_path,
-            "-y",
-            "-ss", f"{self.start_time:.3f}",
-            "-to", f"{self.end_time:.3f}",
+        stream_copy = self.video_codec == "copy" and self.audio_codec == "copy"
+        
+        cmd = [*self.wrapper.base_args, "-ss", format(self.start_time, ".3f")]
+        if stream_copy:
+            # Jump to the nearest index entry; re-encodes need the accurate seek
+            cmd.append("-noaccurate_seek")
+        cmd.extend([
+            *self.wrapper.input_args,
             "-i", self.input_path,
+            # Output duration rather than an input -to, which older ffmpeg lacks
+            "-t", format(self.end_time - self.start_time, ".3f"),
             "-c:v", self.video_codec,
-            "-c:a", self.audio_codec,
-            self.output_path
-        ]
+            "-c:a", self.audio_codec
+        ])
+        if stream_copy:
+            cmd.extend(["-avoid_negative_ts", "make_zero"])
+        cmd.append(self.output_path)
+        
+        return cmd
     
-    def execute(self) -> FFmpegResult:
-        """Execute clip command"""
-        # Ensure output directory exists
-        out_dir = os.path.dirname(self.output_path)
-        if out_dir:
-            os.makedirs(out_dir, exist_ok=True)
+    def execute(self, timeout: Optional[float] = None,
+                progress: Optional[Callable[[float], None]] = None) -> FFmpegResult:
+        """Execute clip command, remuxing in-process when possible
         
-        cmd = self.build_command()
+        The in-process remux is not bounded by timeout and reports no progress.
+        """
+        if PYAV_AVAILABLE and self.video_codec == "copy" and self.audio_codec == "copy":
+            result = self._execute_remux()
+            if result is not None:
+                return result
+        return super().execute(timeout, progress)
+    
+    async def execute_async(self, timeout: Optional[float] = None) -> FFmpegResult:
+        """Execute clip command without blocking the event loop"""
+        if PYAV_AVAILABLE and self.video_codec == "copy" and self.audio_codec == "copy":
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, self._execute_remux)
+            if result is not None:
+                return result
+        return await super().execute_async(timeout)
+    
+    def _execute_remux(self) -> Optional[FFmpegResult]:
+        """Copy the clip's packets with PyAV; None means fall back to ffmpeg"""
+        self._prepare_output_dirs()
+        try:
+            with av.open(self.input_path) as container:
+                remux_clip(container, self.start_time, self.end_time, self.output_path)
+        except Exception:
+            return None
+        return FFmpegResult(success=True, output_files=[self.output_path])
+
+class MultiClipCommand(FFmpegCommand):
+    """FFmpeg command writing several clips from one input in a single process"""
+    
+    error_prefix = "FFmpeg clip failed"
+    
+    def __init__(self, wrapper: FFmpegWrapper, input_path: str, 
+                 clips: List[Tuple[float, float, str]], video_codec: str = "copy", audio_codec: str = "copy"):
+        self.wrapper = wrapper
+        self.input_path = input_path
+        self.clips = clips  # (start_time, end_time, output_path)
+        self.video_codec = video_codec
+        self.audio_codec = audio_codec
+    
+    def build_command(self) -> List[str]:
+        """Build multi-output clip command"""
+        stream_copy = self.video_codec == "copy" and self.audio_codec == "copy"
+        
+        # One seeked input per clip, so each clip starts like a single ClipCommand
+        cmd = [*self.wrapper.base_args]
+        for start_time, end_time, _ in self.clips:
+            cmd.extend(["-ss", format(start_time, ".3f")])
+            if stream_copy:
+                cmd.append("-noaccurate_seek")
+            cmd.extend([
+                *self.wrapper.input_args,
+                "-t", format(end_time - start_time, ".3f"),
+                "-i", self.input_path
+            ])
+        
+        for index, (_, _, output_path) in enumerate(self.clips):
+            cmd.extend([
+                "-map", f"{index}:v?",
+                "-map", f"{index}:a?",
+                "-c:v", self.video_codec,
+                "-c:a", self.audio_codec
+            ])
+            if stream_copy:
+                cmd.extend(["-avoid_negative_ts", "make_zero"])
+            cmd.append(output_path)
         
+        return cmd
+    
+    def output_dirs(self) -> List[str]:
+        """Directories that must exist before the command runs"""
+        return list({os.path.dirname(output_path) for _, _, output_path in self.clips})
+    
+    def collect_result(self) -> FFmpegResult:
+        """Build the result after every clip was written"""
+        return FFmpegResult(success=True, output_files=[output_path for _, _, output_path in self.clips])
+    
+    def execute(self, timeout: Optional[float] = None,
+                progress: Optional[Callable[[float], None]] = None) -> FFmpegResult:
+        """Execute multi-output clip command, remuxing in-process when possible
+        
+        The in-process remux is not bounded by timeout and reports no progress.
+        """
+        if PYAV_AVAILABLE and self.video_codec == "copy" and self.audio_codec == "copy":
+            result = self._execute_remux()
+            if result is not None:
+                return result
+        return super().execute(timeout, progress)
+    
+    async def execute_async(self, timeout: Optional[float] = None) -> FFmpegResult:
+        """Execute multi-output clip command without blocking the event loop"""
+        if PYAV_AVAILABLE and self.video_codec == "copy" and self.audio_codec == "copy":
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, self._execute_remux)
+            if result is not None:
+                return result
+        return await super().execute_async(timeout)
+    
+    def _execute_remux(self) -> Optional[FFmpegResult]:
+        """Copy every clip with PyAV from one opened input; None means fall back to ffmpeg"""
+        self._prepare_output_dirs()
         try:
-            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
-            
-            # Verify output file exists
-            if os.path.exists(self.output_path):
-                return FFmpegResult(success=True, output_files=[self.output_path])
-            else:
-                return FFmpegResult(success=False, error_message="Output file was not created")
-                
-        except subprocess.CalledProcessError as e:
-            return FFmpegResult(success=False, error_message=f"FFmpeg clip failed: {e.stderr}")
-        except Exception as e:
-            return FFmpegResult(success=False, error_message=str(e))
+            with av.open(self.input_path) as container:
+                for start_time, end_time, output_path in self.clips:
+                    remux_clip(container, start_time, end_time, output_path)
+        except Exception:
+            return None
+        return self.collect_result()
+
+def remux_clip(container, start_time: float, end_time: float, output_path: str) -> None:
+    """Copy packets between two timestamps from an open PyAV container (requires PyAV)
+    
+    Like ffmpeg's stream copy with -noaccurate_seek, the clip starts on the
+    keyframe at or before start_time and timestamps are shifted to zero.
+    """
+    streams = [s for s in container.streams if s.type in ("video", "audio")]
+    container.seek(int(start_time * av.time_base), backward=True, any_frame=False)
     
+    with av.open(output_path, mode="w") as output:
+        if hasattr(output, "add_stream_from_template"):
+            out_streams = {s.index: output.add_stream_from_template(s) for s in streams}
+        else:
+            out_streams = {s.index: output.add_stream(template=s) for s in streams}
+        
+        offset = None  # Seconds subtracted from every timestamp
+        finished = set()
+        
+        for packet in container.demux(*streams):
+            # Skip flush packets
+            if packet.dts is None or packet.pts is None:
+                continue
+            
+            index = packet.stream.index
+            packet_time = float(packet.pts * packet.time_base)
+            if packet_time >= end_time:
+                finished.add(index)
+                if len(finished) == len(streams):
+                    break
+                continue
+            if index in finished:
+                continue
+            
+            if offset is None:
+                offset = float(packet.dts * packet.time_base)
+            shift = int(offset / packet.time_base)
+            packet.pts -= shift
+            packet.dts -= shift
+            packet.stream = out_streams[index]
+            output.mux(packet)
+
 from abc import abstractmethod
 from typing import List, Optional
 import os
@@ -303,8 +888,11 @@ import subprocess
 class GifCommand(FFmpegCommand):
     """FFmpeg GIF command - Base class"""
     
+    error_prefix = "FFmpeg GIF creation failed"
+    
     def __init__(self, wrapper: FFmpegWrapper, input_path: str, output_path: str, 
-                 start_time: float, duration: float, filters: str, loop_count: int = 0):
+                 start_time: float, duration: float, filters: str, loop_count: int = 0,
+                 fast_seek: bool = True):
         self.wrapper = wrapper
         self.input_path = input_path
         self.output_path = output_path
@@ -312,37 +900,26 @@ class GifCommand(FFmpegCommand):
         self.duration = duration
         self.loop_count = loop_count
         self.filters = filters
+        self.fast_seek = fast_seek  # Seek on the input instead of decoding up to start_time
+    
+    def interval_args(self) -> List[str]:
+        """Seek and duration options selecting the interval"""
+        return ["-ss", f"{self.start_time:.3f}", "-t", f"{self.duration:.3f}"]
+    
+    def input_command(self) -> List[str]:
+        """Source input, seeked to the interval when fast_seek is set"""
+        # Input-side seek jumps to the preceding keyframe; ffmpeg still trims to the exact frame
+        seek = self.interval_args() if self.fast_seek else []
+        return [*self.wrapper.input_args, *seek, "-i", self.input_path]
+    
+    def output_seek_args(self) -> List[str]:
+        """Output-side interval options, decoding from the start, when fast_seek is off"""
+        return [] if self.fast_seek else self.interval_args()
     
     @abstractmethod
     def build_command(self) -> List[str]:
         """Build GIF command - to be implemented by subclasses"""
         pass
-    
-    def execute(self) -> FFmpegResult:
-        """Execute GIF command"""
-        # Ensure output directory exists
-        out_dir = os.path.dirname(self.output_path)
-        if out_dir:
-            os.makedirs(out_dir, exist_ok=True)
-        
-        cmd = self.build_command()
-        
-        try:
-            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, 
-                         stderr=subprocess.PIPE, text=True)
-            
-            # Verify output file exists
-            if os.path.exists(self.output_path):
-                return FFmpegResult(success=True, output_files=[self.output_path])
-            else:
-                return FFmpegResult(success=False, 
-                                  error_message="Output GIF was not created")
-                
-        except subprocess.CalledProcessError as e:
-            return FFmpegResult(success=False, 
-                              error_message=f"FFmpeg GIF creation failed: {e.stderr}")
-        except Exception as e:
-            return FFmpegResult(success=False, error_message=str(e))
 
 
 class GifOrdinaryCommand(GifCommand):
@@ -353,9 +930,8 @@ class GifOrdinaryCommand(GifCommand):
         
         return [
             self.wrapper.ffmpeg_path,
-            "-ss", f"{self.start_time:.3f}",
-            "-t", f"{self.duration:.3f}",
-            "-i", self.input_path,
+            *self.input_command(),
+            *self.output_seek_args(),
             "-vf", self.filters,
             "-loop", str(self.loop_count),
             "-y",
@@ -368,8 +944,9 @@ class GifColorPaletteCommand(GifCommand):
     
     def __init__(self, wrapper: FFmpegWrapper, input_path: str, output_path: str, 
                  start_time: float, palette_file: str, duration: float, 
-                 filters: str, loop_count: int ,dither: str = "bayer", bayer_scale: int = 5):
-        super().__init__(wrapper, input_path, output_path, start_time, duration, filters, loop_count)
+                 filters: str, loop_count: int ,dither: str = "bayer", bayer_scale: int = 5,
+                 fast_seek: bool = True):
+        super().__init__(wrapper, input_path, output_path, start_time, duration, filters, loop_count, fast_seek)
         self.palette_file = palette_file
         self.dither = dither
         self.bayer_scale = bayer_scale
@@ -382,10 +959,9 @@ class GifColorPaletteCommand(GifCommand):
         
         return [
             self.wrapper.ffmpeg_path,
-            "-ss", f"{self.start_time:.3f}",
-            "-t", f"{self.duration:.3f}",
-            "-i", self.input_path,
+            *self.input_command(),
             "-i", self.palette_file,
+            *self.output_seek_args(),
             "-filter_complex", filter_complex,
             "-loop", str(self.loop_count),
             "-y",
@@ -396,6 +972,8 @@ class GifColorPaletteCommand(GifCommand):
 class ThumbnailCommand(FFmpegCommand):
     """FFmpeg thumbnail extraction command"""
     
+    error_prefix = "FFmpeg thumbnail extraction failed"
+    
     def __init__(self, wrapper: FFmpegWrapper, input_path: str, output_path: str):
         self.wrapper = wrapper
         self.input_path = input_path
@@ -411,33 +989,132 @@ class ThumbnailCommand(FFmpegCommand):
             "-y",
             self.output_path
         ]
+
+class MultiThumbnailCommand(FFmpegCommand):
+    """FFmpeg command extracting frames at several timestamps in a single process"""
+    
+    error_prefix = "FFmpeg thumbnail extraction failed"
     
-    def execute(self) -> FFmpegResult:
-        """Execute thumbnail command"""
-        # Ensure output directory exists
-        out_dir = os.path.dirname(self.output_path)
-        if out_dir:
-            os.makedirs(out_dir, exist_ok=True)
+    def __init__(self, wrapper: FFmpegWrapper, input_path: str, thumbnails: List[Tuple[float, str]],
+                 size: Optional[Tuple[int, int]] = None):
+        self.wrapper = wrapper
+        self.input_path = input_path
+        self.thumbnails = thumbnails  # (timestamp, output_path)
+        self.size = size  # Optional (width, height) the frames are scaled to
+    
+    def build_command(self) -> List[str]:
+        """Build multi-thumbnail command"""
+        # One fast-seeked input per timestamp, so no frames between them are decoded
+        cmd = [*self.wrapper.base_args]
+        for timestamp, _ in self.thumbnails:
+            cmd.extend(["-ss", format(timestamp, ".3f"), "-i", self.input_path])
         
-        cmd = self.build_command()
+        scale_args = ["-vf", f"scale={self.size[0]}:{self.size[1]}:flags=lanczos"] if self.size else []
+        for index, (_, output_path) in enumerate(self.thumbnails):
+            cmd.extend([
+                "-map", f"{index}:v:0",
+                *scale_args,
+                "-frames:v", "1",
+                "-q:v", "1",  # Highest quality for thumbnails
+                output_path
+            ])
         
-        try:
-            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
-            
-            # Verify output file exists
-            if os.path.exists(self.output_path):
-                return FFmpegResult(success=True, output_files=[self.output_path])
-            else:
-                return FFmpegResult(success=False, error_message="Thumbnail was not created")
-                
-        except subprocess.CalledProcessError as e:
-            return FFmpegResult(success=False, error_message=f"FFmpeg thumbnail extraction failed: {e.stderr}")
-        except Exception as e:
-            return FFmpegResult(success=False, error_message=str(e))
+        return cmd
+    
+    def output_dirs(self) -> List[str]:
+        """Directories that must exist before the command runs"""
+        return list({os.path.dirname(output_path) for _, output_path in self.thumbnails})
+    
+    def collect_result(self) -> FFmpegResult:
+        """Build the result after every thumbnail was written"""
+        return FFmpegResult(success=True, output_files=[output_path for _, output_path in self.thumbnails])
+
+def concat_video_graph(input_count: int) -> str:
+    """Filter graph prefix joining the video of every input in order"""
+    return "".join(f"[{index}:v]" for index in range(input_count)) + f"concat=n={input_count}:v=1:a=0"
+
+def concat_input_args(input_paths: List[str],
+                      input_intervals: Optional[List[Tuple[float, float]]] = None) -> List[str]:
+    """Input options for concat commands, each optionally seeked to a (start, duration) interval"""
+    args = []
+    for index, input_path in enumerate(input_paths):
+        if input_intervals:
+            start_time, duration = input_intervals[index]
+            args.extend(["-ss", format(start_time, ".3f"), "-t", format(duration, ".3f")])
+        args.extend(["-i", input_path])
+    return args
+
+class ConcatGifCommand(FFmpegCommand):
+    """FFmpeg command encoding several clips straight into one GIF"""
+    
+    error_prefix = "FFmpeg GIF creation failed"
+    
+    def __init__(self, wrapper: FFmpegWrapper, input_paths: List[str], output_path: str, filters: str,
+                 loop_count: int = 0, palette_file: Optional[str] = None,
+                 dither: str = "bayer", bayer_scale: int = 5,
+                 input_intervals: Optional[List[Tuple[float, float]]] = None,
+                 inline_palette: bool = False):
+        self.wrapper = wrapper
+        self.input_paths = input_paths
+        self.input_intervals = input_intervals  # Optional (start, duration) read from each input
+        self.output_path = output_path
+        self.filters = filters
+        self.loop_count = loop_count
+        self.palette_file = palette_file  # Optional palette from ConcatPaletteCommand
+        self.inline_palette = inline_palette  # Generate the palette in this pass instead
+        self.dither = dither
+        self.bayer_scale = bayer_scale
+    
+    def build_command(self) -> List[str]:
+        """Build concat GIF command"""
+        cmd = [*self.wrapper.base_args, *concat_input_args(self.input_paths, self.input_intervals)]
+        
+        input_count = len(self.input_paths)
+        filter_complex = f"{concat_video_graph(input_count)},{self.filters}"
+        paletteuse = f"paletteuse=dither={self.dither}:bayer_scale={self.bayer_scale}"
+        if self.inline_palette:
+            # Decodes once, but split buffers every frame until palettegen has seen them all
+            filter_complex += f",split[x][y];[y]palettegen=max_colors=256[p];[x][p]{paletteuse}"
+        elif self.palette_file:
+            cmd.extend(["-i", self.palette_file])
+            filter_complex += f"[x];[x][{input_count}:v]{paletteuse}"
+        
+        cmd.extend([
+            "-filter_complex", filter_complex,
+            "-loop", str(self.loop_count),
+            self.output_path
+        ])
+        return cmd
+
+class ConcatPaletteCommand(FFmpegCommand):
+    """FFmpeg color palette generation over several concatenated clips"""
+    
+    error_prefix = "FFmpeg palette generation failed"
+    
+    def __init__(self, wrapper: FFmpegWrapper, input_paths: List[str], output_path: str, filters: str,
+                 input_intervals: Optional[List[Tuple[float, float]]] = None):
+        self.wrapper = wrapper
+        self.input_paths = input_paths
+        self.output_path = output_path
+        self.filters = filters
+        self.input_intervals = input_intervals  # Optional (start, duration) read from each input
+    
+    def build_command(self) -> List[str]:
+        """Build concat palette command"""
+        cmd = [*self.wrapper.base_args, *concat_input_args(self.input_paths, self.input_intervals)]
+        
+        cmd.extend([
+            "-filter_complex",
+            f"{concat_video_graph(len(self.input_paths))},{self.filters},palettegen=max_colors=256",
+            self.output_path
+        ])
+        return cmd
 
 class ColorPaletteCommand(FFmpegCommand):
     """FFmpeg color palette generation command"""
     
+    error_prefix = "FFmpeg palette generation failed"
+    
     def __init__(self, wrapper: FFmpegWrapper, input_path: str, output_path: str, filters: str):
         self.wrapper = wrapper
         self.input_path = input_path
@@ -453,26 +1130,3 @@ class ColorPaletteCommand(FFmpegCommand):
             "-y",
             self.output_path
         ]
-    
-    def execute(self) -> FFmpegResult:
-        """Execute color palette command"""
-        # Ensure output directory exists
-        out_dir = os.path.dirname(self.output_path)
-        if out_dir:
-            os.makedirs(out_dir, exist_ok=True)
-        
-        cmd = self.build_command()
-        
-        try:
-            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
-            
-            # Verify output file exists
-            if os.path.exists(self.output_path):
-                return FFmpegResult(success=True, output_files=[self.output_path])
-            else:
-                return FFmpegResult(success=False, error_message="Palette file was not created")
-                
-        except subprocess.CalledProcessError as e:
-            return FFmpegResult(success=False, error_message=f"FFmpeg palette generation failed: {e.stderr}")
-        except Exception as e:
-            return FFmpegResult(success=False, error_message=str(e))
\ No newline at end of file
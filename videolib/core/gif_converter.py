@@ -1,6 +1,11 @@
+import functools
+import hashlib
 import os
+import tempfile
 import time
 import json
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Optional, Dict
 
 # PIL for grid creation (optional)
@@ -10,21 +15,58 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
+# libvips for shrink-on-load thumbnail decoding (optional)
+try:
+    import pyvips
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):
+    PYVIPS_AVAILABLE = False
+
+# NumPy for computing long interval lists in one pass (optional)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Below this many intervals a list comprehension is cheaper than building arrays
+NUMPY_MIN_INTERVALS = 64
+
+# Units of _format_file_size, 1024 apart
+FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Grid thumbnails are box-reduced to within this factor of their size before resampling
+GRID_REDUCING_GAP = 3.0
+
+# WebP grid encoder settings: near-lossless looking previews at a moderate encoder effort
+GRID_WEBP_QUALITY = 85
+GRID_WEBP_METHOD = 4
+
+from ..utils import FileManager
 from ..interfaces.gif_interface import (
     GifConverterInterface, GifOptions, GifResult, GifInterval, AutoGifOptions
 )
 from .ffmpeg_wrapper import (
     FFmpegWrapper, FFmpegResult, MediaInfo,
-    ClipCommand, GifOrdinaryCommand, GifColorPaletteCommand, 
-    ThumbnailCommand, ColorPaletteCommand
+    ClipCommand, MultiClipCommand, GifCommand, GifOrdinaryCommand, GifColorPaletteCommand, 
+    ThumbnailCommand, MultiThumbnailCommand, ColorPaletteCommand,
+    ConcatGifCommand, ConcatPaletteCommand, get_default_wrapper
 )
 
 
 class VideoGifConverter(GifConverterInterface):
     """Enhanced Video to GIF converter using video-clips-first workflow"""
 
-    def __init__(self, ffmpeg_wrapper: FFmpegWrapper = None):
+    def __init__(self, ffmpeg_wrapper: FFmpegWrapper = None, palette_cache_dir: Optional[str] = None,
+                 grid_cache_dir: Optional[str] = None):
         self.ffmpeg = ffmpeg_wrapper or FFmpegWrapper()
+        self.palette_cache_dir = palette_cache_dir  # Directory persisting palettes across processes
+        self.grid_cache_dir = grid_cache_dir  # Directory persisting thumbnail grids across processes
+        # Palettes per (source realpath, mtime, size, filters), reused across create_gifs calls
+        self._palette_cache: Dict[Tuple[str, int, int, str], str] = {}
+        weakref.finalize(self, _remove_palettes, self._palette_cache)
+        # Text measurements per (font, text); fonts are cached module-wide, so keys stay valid
+        self._text_sizes: Dict[Tuple[object, str], Tuple[int, int]] = {}
 
     def create_gifs(self, options: GifOptions) -> GifResult:
         """Create multiple GIF clips from video using traditional workflow"""
@@ -34,28 +76,29 @@ class VideoGifConverter(GifConverterInterface):
             if not self._validate_options(options):
                 return self._error_result("Invalid options", start_time)
 
-            gif_files = []
-            thumbnail_files = []
-
-            # Generate palette for better quality
+            # Generate (or reuse) the palette for better quality
             palette_file = self._create_palette(options) if options.quality_level == "high" else None
 
-            # Process each interval - traditional single GIF approach
-            for interval in options.intervals:
-                # Create GIF directly from source
-                gif_file = self._create_gif(interval, options, palette_file)
-                if gif_file:
-                    gif_files.append(gif_file)
-
-                    # Create thumbnail if requested
-                    if options.create_thumbnails:
-                        thumb_file = self._create_thumbnail(gif_file, interval.output_name, options.thumbnail_extension)
-                        if thumb_file:
-                            thumbnail_files.append(thumb_file)
-
-            # Cleanup palette
-            if palette_file and os.path.exists(palette_file):
-                os.remove(palette_file)
+            # Create every GIF directly from source, intervals run in parallel
+            filters = self._build_quality_filters(options)
+            gif_cmds = [self._build_gif_command(interval, options, palette_file, filters)
+                        for interval in options.intervals]
+            gif_results = self.ffmpeg.run_many(gif_cmds, options.max_parallel)
+            created = [(interval, cmd.output_path)
+                       for interval, cmd, result in zip(options.intervals, gif_cmds, gif_results)
+                       if result.success]
+            gif_files = [gif_file for _, gif_file in created]
+
+            # Create thumbnails if requested
+            thumbnail_files = []
+            if options.create_thumbnails and created:
+                thumb_cmds = [
+                    ThumbnailCommand(self.ffmpeg, gif_file,
+                                     f"{interval.output_name}_thumb.{options.thumbnail_extension}")
+                    for interval, gif_file in created
+                ]
+                thumb_results = self.ffmpeg.run_many(thumb_cmds, options.max_parallel)
+                thumbnail_files = [cmd.output_path for cmd, result in zip(thumb_cmds, thumb_results) if result.success]
 
             return GifResult(
                 success=len(gif_files) > 0,
@@ -80,64 +123,76 @@ class VideoGifConverter(GifConverterInterface):
         return self.create_gifs(options)
 
     def create_auto_generated_clips(self, options: AutoGifOptions) -> GifResult:
-        """Create auto-generated GIF clips using NEW video-clips-first workflow"""
+        """Create auto-generated GIF clips from the source, with video clips as fallback"""
         start_time = time.time()
+        video_clips = []
         
         try:
             # Step 1: Calculate intervals with time gaps
             intervals = self._calculate_auto_intervals(options)
             
-            # Step 2: Create video clips first using ClipCommand
-            video_clips = self._create_video_clips(options.source_file, intervals)
-            if not video_clips:
-                return self._error_result("Failed to create video clips", start_time)
+            # Step 2: Encode the intervals straight from the source into one GIF
+            gif_file = self._convert_clips_to_gif(
+                [options.source_file] * len(intervals),
+                options,
+                [(interval.start_time, interval.end_time - interval.start_time) for interval in intervals]
+            )
+            
+            # A stored grid for the same source and layout replaces thumbnails that would be discarded
+            stored_grid = None
+            if self.grid_cache_dir and options.create_grid and PIL_AVAILABLE:
+                stored_grid = self._stored_grid_path(options)
+            grid_cached = stored_grid is not None and os.path.exists(stored_grid)
+            create_thumbnails = options.create_thumbnails and not (grid_cached and options.cleanup_individual_thumbs)
             
-            # Step 3: Create thumbnails from video clips (not GIFs)
+            # Step 3: Create thumbnails from the source, at grid cell size when only the grid is kept
             thumbnail_files = []
-            if options.create_thumbnails:
-                thumbnail_files = self._create_thumbnails_from_videos(video_clips, intervals)
-            
-            # Step 4: Merge all video clips into one video
-            merged_video = self._merge_video_clips(video_clips, f"{options.output_name}_merged.mp4")
-            if not merged_video:
-                return self._error_result("Failed to merge video clips", start_time)
-            
-            # Step 5: Convert merged video to GIF with media info
-            gif_files = []
-            if merged_video:
-                gif_file = self._convert_video_to_gif(merged_video, options)
-                if gif_file:
-                    gif_files.append(gif_file)
-            
-            # Step 6: Get media info and create enhanced results
+            if create_thumbnails:
+                thumb_size = None
+                if options.create_grid and options.cleanup_individual_thumbs and PIL_AVAILABLE:
+                    grid_layout = self._calculate_grid_layout(len(intervals), options.grid_size, options)
+                    thumb_size = (grid_layout['thumb_width'], grid_layout['thumb_height'])
+                thumbnail_files = self._create_thumbnails_from_source(options.source_file, intervals, thumb_size)
+            
+            # Step 4: Fall back to stream-copied video clips for whatever the source could not provide
+            if not gif_file or (create_thumbnails and not thumbnail_files):
+                video_clips = self._create_video_clips(options.source_file, intervals, options.max_parallel)
+                if not video_clips:
+                    return self._error_result("Failed to create video clips", start_time)
+                if not gif_file:
+                    gif_file = self._convert_clips_to_gif(video_clips, options)
+                if create_thumbnails and not thumbnail_files:
+                    thumbnail_files = self._create_thumbnails_from_videos(video_clips, intervals, options.max_parallel)
+            
+            gif_files = [gif_file] if gif_file else []
+            
+            # Step 5: Get media info and create enhanced results
             media_info = self._get_media_info_dict(options.source_file)
             
-            # Step 7: Create enhanced thumbnail grid
+            # Step 6: Create enhanced thumbnail grid (or copy the stored one)
             grid_file = None
-            if options.create_grid and thumbnail_files and PIL_AVAILABLE:
+            grid_output = f"{options.output_name}_grid.{options.grid_format.lower()}"
+            if grid_cached and FileManager.copy_file(stored_grid, grid_output):
+                grid_file = grid_output
+            elif options.create_grid and thumbnail_files and PIL_AVAILABLE:
                 grid_file = self._create_enhanced_grid(
                     thumbnail_files, 
                     media_info,
-                    f"{options.output_name}_grid.png",
+                    grid_output,
                     options.grid_size, 
                     intervals,
                     options=options 
                 )
-                if grid_file:
-                    thumbnail_files.append(grid_file)
+                if grid_file and stored_grid:
+                    self._store_grid(grid_file, stored_grid)
+            if grid_file:
+                thumbnail_files.append(grid_file)
             
             #Cleanup individual thumbnails if requested
             if options.cleanup_individual_thumbs and grid_file and thumbnail_files:
                 cleaned_thumbnails = self._cleanup_individual_thumbnails(thumbnail_files, grid_file)
                 thumbnail_files = cleaned_thumbnails
 
-            # Cleanup temporary video clips
-            for clip in video_clips:
-                if os.path.exists(clip):
-                    os.remove(clip)
-            if merged_video and os.path.exists(merged_video):
-                os.remove(merged_video)
-            
             result = GifResult(
                 success=len(gif_files) > 0,
                 gif_files=gif_files,
@@ -152,6 +207,11 @@ class VideoGifConverter(GifConverterInterface):
         except Exception as e:
             return self._error_result(str(e), start_time)
         
+        finally:
+            # Cleanup temporary video clips, also when a later step failed
+            for clip in video_clips:
+                FileManager.delete_file(clip)
+        
     def create_one_click_gif(self, source_file: str, output_name: str = "oneclick") -> GifResult:
         """One-click video to GIF conversion with automatic settings"""
         start_time = time.time()
@@ -260,16 +320,16 @@ class VideoGifConverter(GifConverterInterface):
             if thumb_file == grid_file:
                 # Keep the grid file
                 cleaned_files.append(thumb_file)
-            elif thumb_file.endswith('_grid.png'):
+            elif os.path.splitext(thumb_file)[0].endswith('_grid'):
                 # Keep any grid files
                 cleaned_files.append(thumb_file)
             else:
                 # Remove individual thumbnail files
                 try:
-                    if os.path.exists(thumb_file):
-                        os.remove(thumb_file)
-                        removed_count += 1
-                        print(f"Removed individual thumbnail: {thumb_file}")
+                    os.remove(thumb_file)
+                    removed_count += 1
+                except FileNotFoundError:
+                    pass
                 except Exception as e:
                     print(f"Warning: Could not remove {thumb_file}: {e}")
                     # Keep the file if we can't remove it
@@ -280,152 +340,127 @@ class VideoGifConverter(GifConverterInterface):
         
         return cleaned_files
     
-    def _create_video_clips(self, source_file: str, intervals: List[GifInterval]) -> List[str]:
+    def _create_video_clips(self, source_file: str, intervals: List[GifInterval],
+                            max_parallel: Optional[int] = None) -> List[str]:
         """Create video clips using ClipCommand from ffmpeg_wrapper"""
-        video_clips = []
+        clip_paths = [f"temp_clip_{i+1:03d}.mp4" for i in range(len(intervals))]
+        
+        # Stream copies of every interval in one ffmpeg process (or one PyAV pass)
+        if len(intervals) > 1:
+            multi_cmd = MultiClipCommand(
+                self.ffmpeg,
+                source_file,
+                [(interval.start_time, interval.end_time, clip_path)
+                 for interval, clip_path in zip(intervals, clip_paths)]
+            )
+            if multi_cmd.execute().success:
+                return clip_paths
         
-        for i, interval in enumerate(intervals):
-            clip_file = f"temp_clip_{i+1:03d}.mp4"
-            
-            # Use your existing ClipCommand
-            clip_cmd = ClipCommand(
+        # Single clip, or retry one process per clip so partial results survive
+        clip_cmds = [
+            ClipCommand(
                 wrapper=self.ffmpeg,
                 input_path=source_file,
-                output_path=clip_file,
+                output_path=clip_path,
                 start_time=interval.start_time,
                 end_time=interval.end_time,
                 video_codec="copy",  # Fast copy without re-encoding
                 audio_codec="copy"
             )
-            
-            result = clip_cmd.execute()
-            if result.success and os.path.exists(clip_file):
-                video_clips.append(clip_file)
+            for interval, clip_path in zip(intervals, clip_paths)
+        ]
+        
+        # Clips are independent, so their ffmpeg processes run in parallel
+        video_clips = []
+        for clip_cmd, result in zip(clip_cmds, self.ffmpeg.run_many(clip_cmds, max_parallel)):
+            if result.success:
+                video_clips.append(clip_cmd.output_path)
             else:
-                print(f"Warning: Failed to create clip {clip_file}")
+                print(f"Warning: Failed to create clip {clip_cmd.output_path}")
         
         return video_clips
 
-    def _create_thumbnails_from_videos(self, video_clips: List[str], intervals: List[GifInterval]) -> List[str]:
+    def _create_thumbnails_from_source(self, source_file: str, intervals: List[GifInterval],
+                                       size: Optional[Tuple[int, int]] = None) -> List[str]:
+        """Create all interval thumbnails from the source with one ffmpeg process"""
+        thumb_cmd = MultiThumbnailCommand(
+            self.ffmpeg,
+            source_file,
+            [(interval.start_time, f"{interval.output_name}_thumb.png") for interval in intervals],
+            size
+        )
+        result = thumb_cmd.execute()
+        return result.output_files if result.success else []
+
+    def _create_thumbnails_from_videos(self, video_clips: List[str], intervals: List[GifInterval],
+                                       max_parallel: Optional[int] = None) -> List[str]:
         """Create thumbnails from video clips (not GIFs)"""
-        thumbnail_files = []
+        # Use existing ThumbnailCommand to extract first frame from each video
+        thumb_cmds = [
+            ThumbnailCommand(self.ffmpeg, video_clip, f"{interval.output_name}_thumb.png")
+            for video_clip, interval in zip(video_clips, intervals)
+        ]
         
-        for video_clip, interval in zip(video_clips, intervals):
-            thumb_file = f"{interval.output_name}_thumb.png"
-            
-            # Use existing ThumbnailCommand to extract first frame from video
-            thumb_cmd = ThumbnailCommand(self.ffmpeg, video_clip, thumb_file)
-            result = thumb_cmd.execute()
-            
-            if result.success and os.path.exists(thumb_file):
-                thumbnail_files.append(thumb_file)
+        thumbnail_files = []
+        for thumb_cmd, result in zip(thumb_cmds, self.ffmpeg.run_many(thumb_cmds, max_parallel)):
+            if result.success:
+                thumbnail_files.append(thumb_cmd.output_path)
             else:
-                print(f"Warning: Failed to create thumbnail from {video_clip}")
+                print(f"Warning: Failed to create thumbnail from {thumb_cmd.input_path}")
         
         return thumbnail_files
 
-    def _merge_video_clips(self, video_clips: List[str], output_file: str) -> Optional[str]:
-        """Merge multiple video clips into one video using FFmpeg concat"""
-        try:
-            if not video_clips:
-                return None
-            
-            # Create concat file for FFmpeg
-            concat_file = "temp_video_concat.txt"
-            
-            with open(concat_file, 'w') as f:
-                for clip in video_clips:
-                    # Escape file paths for FFmpeg
-                    escaped_path = clip.replace('\\', '\\\\').replace("'", "\\'")
-                    f.write(f"file '{escaped_path}' \n")
-            
-            # Use FFmpeg concat demuxer to merge videos
-            import subprocess
-            cmd = [
-                self.ffmpeg.ffmpeg_path,
-                "-f", "concat",
-                "-safe", "0",
-                "-i", concat_file,
-                "-c", "copy",  # Copy streams without re-encoding
-                "-y", output_file
-            ]
-            
-            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            
-            # Cleanup
-            if os.path.exists(concat_file):
-                os.remove(concat_file)
-            
-            return output_file if os.path.exists(output_file) else None
-            
-        except Exception as e:
-            print(f"Video merge failed: {e}")
-            return None
-
-    def _convert_video_to_gif(self, video_file: str, options: AutoGifOptions) -> Optional[str]:
-        """Convert merged video to GIF with embedded media info"""
+    def _convert_clips_to_gif(self, video_clips: List[str], options: AutoGifOptions,
+                              clip_intervals: Optional[List[Tuple[float, float]]] = None) -> Optional[str]:
+        """Concatenate video clips, or (start, duration) intervals of them, into one GIF"""
         gif_file = f"{options.output_name}_final.gif"
+        inline_palette = options.quality_level == "high" and options.single_pass_palette
+        palette_file = "temp_final_palette.png" if options.quality_level == "high" and not inline_palette else None
         
         try:
             # Build quality filters
             filters = self._build_quality_filters_for_auto(options)
             
             # Create palette for high quality
-            palette_file = None
-            if options.quality_level == "high":
-                palette_file = "temp_final_palette.png"
-                palette_cmd = ColorPaletteCommand(self.ffmpeg, video_file, palette_file, filters)
-                if not palette_cmd.execute().success:
-                    palette_file = None
-            
-            # Convert to GIF
-            if palette_file and os.path.exists(palette_file):
-                # High quality with palette
-                gif_cmd = GifColorPaletteCommand(
-                    wrapper=self.ffmpeg,
-                    input_path=video_file,
-                    output_path=gif_file,
-                    start_time=0.0,  # Use entire merged video
-                    palette_file=palette_file,
-                    duration=0.0,  # 0 means use entire video
-                    filters=filters,
-                    loop_count=0  # Infinite loop
-                )
-            else:
-                # Standard quality
-                gif_cmd = GifOrdinaryCommand(
-                    wrapper=self.ffmpeg,
-                    input_path=video_file,
-                    output_path=gif_file,
-                    start_time=0.0,
-                    duration=0.0,  # Use entire video
-                    filters=filters,
-                    loop_count=0
-                )
+            palette_ready = False
+            if palette_file:
+                palette_cmd = ConcatPaletteCommand(self.ffmpeg, video_clips, palette_file, filters, clip_intervals)
+                palette_ready = palette_cmd.execute().success
             
+            # Convert to GIF, with the palette when one was generated
+            gif_cmd = ConcatGifCommand(
+                wrapper=self.ffmpeg,
+                input_paths=video_clips,
+                output_path=gif_file,
+                filters=filters,
+                loop_count=0,  # Infinite loop
+                palette_file=palette_file if palette_ready else None,
+                input_intervals=clip_intervals,
+                inline_palette=inline_palette
+            )
             result = gif_cmd.execute()
             
-            # Cleanup palette
-            if palette_file and os.path.exists(palette_file):
-                os.remove(palette_file)
-            
             return gif_file if result.success else None
             
         except Exception as e:
             print(f"Video to GIF conversion failed: {e}")
             return None
+        
+        finally:
+            # Cleanup palette, including one left behind by a failed run
+            if palette_file:
+                FileManager.delete_file(palette_file)
 
     # --- TRADITIONAL WORKFLOW METHODS (renamed) ---
 
-    def _create_gif(self, interval: GifInterval, options: GifOptions, 
-                   palette_file: Optional[str]) -> Optional[str]:
-        """Create single GIF using traditional workflow (renamed from _create_single_gif)"""
+    def _build_gif_command(self, interval: GifInterval, options: GifOptions,
+                           palette_file: Optional[str], filters: str) -> GifCommand:
+        """Build the command for a single GIF using traditional workflow"""
         output_file = f"{interval.output_name}.{options.output_extension}"
         duration = interval.end_time - interval.start_time
-        filters = self._build_quality_filters(options)
 
-        if palette_file and os.path.exists(palette_file):
-            # Use high-quality palette command
+        if palette_file:
+            # Use high-quality palette command (_create_palette only returns existing palettes)
             cmd = GifColorPaletteCommand(
                 wrapper=self.ffmpeg,
                 input_path=options.source_file,
@@ -434,7 +469,8 @@ class VideoGifConverter(GifConverterInterface):
                 palette_file=palette_file,
                 duration=duration,
                 filters=filters,
-                loop_count=options.loop_count
+                loop_count=options.loop_count,
+                fast_seek=options.fast_seek
             )
         else:
             # Use ordinary command
@@ -445,11 +481,11 @@ class VideoGifConverter(GifConverterInterface):
                 start_time=interval.start_time,
                 duration=duration,
                 filters=filters,
-                loop_count=options.loop_count
+                loop_count=options.loop_count,
+                fast_seek=options.fast_seek
             )
 
-        result = cmd.execute()
-        return output_file if result.success else None
+        return cmd
 
     # --- HELPER METHODS ---
 
@@ -462,35 +498,89 @@ class VideoGifConverter(GifConverterInterface):
 
     def _calculate_auto_intervals(self, options: AutoGifOptions) -> List[GifInterval]:
         """Calculate sequential intervals with time gaps"""
-        intervals = []
-        current_start = 0.0
+        starts = _interval_starts(options.num_clips, options.gif_duration + options.time_gap)
         
-        for i in range(options.num_clips):
-            intervals.append(GifInterval(
-                start_time=current_start,
-                end_time=current_start + options.gif_duration,
+        return [
+            GifInterval(
+                start_time=start,
+                end_time=start + options.gif_duration,
                 output_name=f"{options.output_name}_{i+1:03d}"
-            ))
-            current_start += options.gif_duration + options.time_gap
-        
-        return intervals
+            )
+            for i, start in enumerate(starts)
+        ]
 
     def _create_palette(self, options: GifOptions) -> Optional[str]:
-        """Create color palette using existing command"""
-        palette_file = "temp_palette.png"
-        filters = self._build_quality_filters(options)
+        """Create color palette using existing command, reusing one built for the same source
+        
+        With palette_cache_dir set, palettes are kept there and reused by
+        later runs until the source file changes.
+        """
+        filters = self._build_palette_filters(options)
+        source_stat = os.stat(options.source_file)
+        key = (os.path.realpath(options.source_file), source_stat.st_mtime_ns, source_stat.st_size, filters)
+        
+        palette_file = self._palette_cache.get(key)
+        if palette_file and os.path.exists(palette_file):
+            return palette_file
+        
+        if self.palette_cache_dir:
+            stored_path = self._stored_palette_path(key)
+            if os.path.exists(stored_path):
+                return stored_path
+            os.makedirs(self.palette_cache_dir, exist_ok=True)
+            # Generated beside its final path, then moved so readers never see a partial file
+            fd, palette_file = tempfile.mkstemp(dir=self.palette_cache_dir, suffix=".tmp.png")
+        else:
+            fd, palette_file = tempfile.mkstemp(prefix="videolib_palette_", suffix=".png")
+        os.close(fd)
         
         cmd = ColorPaletteCommand(self.ffmpeg, options.source_file, palette_file, filters)
         result = cmd.execute()
+        if not result.success:
+            FileManager.delete_file(palette_file)
+            return None
         
-        return palette_file if result.success else None
-
-    def _create_thumbnail(self, source_file: str, output_name: str, extension: str) -> Optional[str]:
-        """Create thumbnail using existing command"""
-        thumb_file = f"{output_name}_thumb.{extension}"
-        cmd = ThumbnailCommand(self.ffmpeg, source_file, thumb_file)
-        result = cmd.execute()
-        return thumb_file if result.success else None
+        if self.palette_cache_dir:
+            os.replace(palette_file, stored_path)
+            return stored_path
+        
+        self._palette_cache[key] = palette_file
+        return palette_file
+    
+    def _stored_palette_path(self, key: Tuple[str, int, int, str]) -> str:
+        """Path of the on-disk palette for a cache key"""
+        digest = hashlib.sha1("\0".join(map(str, key)).encode("utf-8", "surrogateescape")).hexdigest()
+        return os.path.join(self.palette_cache_dir, f"palette_{digest}.png")
+    
+    def _stored_grid_path(self, options: AutoGifOptions) -> str:
+        """Path of the on-disk grid for a source file and the options that shape its pixels"""
+        source_stat = os.stat(options.source_file)
+        key = (
+            os.path.realpath(options.source_file), source_stat.st_mtime_ns, source_stat.st_size,
+            options.num_clips, options.gif_duration, options.time_gap, options.grid_size,
+            options.grid_thumb_width, options.grid_thumb_height, options.grid_max_width, options.grid_max_height,
+            options.cleanup_individual_thumbs, options.grid_compress_level
+        )
+        digest = hashlib.sha1("\0".join(map(str, key)).encode("utf-8", "surrogateescape")).hexdigest()
+        return os.path.join(self.grid_cache_dir, f"grid_{digest}.{options.grid_format.lower()}")
+    
+    def _store_grid(self, grid_file: str, stored_path: str) -> None:
+        """Copy a new grid into grid_cache_dir without exposing a partial file"""
+        try:
+            os.makedirs(self.grid_cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.grid_cache_dir, suffix=".tmp")
+            os.close(fd)
+            if FileManager.copy_file(grid_file, temp_path):
+                os.replace(temp_path, stored_path)
+            else:
+                FileManager.delete_file(temp_path)
+        except OSError:
+            # The grid cache is an optimization; the grid itself was already written
+            pass
+    
+    def clear_palette_cache(self) -> None:
+        """Delete all temporary cached palettes (palette_cache_dir is left alone)"""
+        _remove_palettes(self._palette_cache)
 
     def _build_quality_filters(self, options: GifOptions) -> str:
         """Build FFmpeg filters based on quality for traditional workflow"""
@@ -502,6 +592,15 @@ class VideoGifConverter(GifConverterInterface):
             return f"{base},mpdecimate=hi=64*12:lo=64*5:frac=0.1"
         return base
 
+    def _build_palette_filters(self, options: GifOptions) -> str:
+        """Build FFmpeg filters feeding palettegen, sampling the source sparsely"""
+        if options.palette_sample_fps is None:
+            return self._build_quality_filters(options)
+        
+        # A palette is a color histogram, so a few frames per second represent the source
+        sample_fps = min(options.palette_sample_fps, options.fps)
+        return f"fps={sample_fps},scale={options.scale_width}:-1:flags=lanczos"
+
     def _build_quality_filters_for_auto(self, options: AutoGifOptions) -> str:
         """Build FFmpeg filters based on quality for auto workflow"""
         # Use final resolution settings
@@ -554,11 +653,12 @@ class VideoGifConverter(GifConverterInterface):
 
     def _get_media_info_dict(self, source_file: str) -> Dict[str, str]:
         """Get media info using existing wrapper"""
-        result = self.ffmpeg.probe_media(source_file)
+        # One stat serves both the probe cache lookup and the creation time
+        file_stat = FileManager.stat_or_none(source_file)
+        result = self.ffmpeg.probe_media(source_file, file_stat) if file_stat else None
         
-        if result.success and result.media_info:
+        if result and result.success and result.media_info:
             info = result.media_info
-            file_stat = os.stat(source_file) if os.path.exists(source_file) else None
             
             return {
                 'filename': os.path.basename(source_file),
@@ -589,39 +689,19 @@ class VideoGifConverter(GifConverterInterface):
                 return None
             
             # Calculate grid layout with resolution control
-            grid_layout = self._calculate_grid_layout(thumb_files, grid_size, options)
-
-            # Load first thumbnail for dimensions
-            first_thumb = Image.open(thumb_files[0])
-            w, h = first_thumb.size
-            first_thumb.close()
+            grid_layout = self._calculate_grid_layout(len(thumb_files), grid_size, options)
             
             # Use calculated thumbnail dimensions
             thumb_width = grid_layout['thumb_width']
             thumb_height = grid_layout['thumb_height']
             cols = grid_layout['cols']
             rows = grid_layout['rows']
-            
-            # Create canvas with header space
-            header_height = 150
+            header_height = grid_layout['header_height']
             canvas_width = cols * thumb_width
             canvas_height = rows * thumb_height + header_height
-            
-            #Apply maximum grid size limits
-            if options and (canvas_width > options.grid_max_width or canvas_height > options.grid_max_height):
-                scale_factor = min(
-                    options.grid_max_width / canvas_width,
-                    options.grid_max_height / canvas_height
-                )
-                
-                # Recalculate with scaling
-                thumb_width = int(thumb_width * scale_factor)
-                thumb_height = int(thumb_height * scale_factor)
-                canvas_width = cols * thumb_width
-                canvas_height = rows * thumb_height + int(header_height * scale_factor)
-                header_height = int(header_height * scale_factor)
-                
-                print(f"📏 Scaled to fit limits: {canvas_width}x{canvas_height} (scale: {scale_factor:.2f})")
+            if grid_layout['scale_factor'] < 1.0:
+                print(f"📏 Scaled to fit limits: {canvas_width}x{canvas_height} "
+                      f"(scale: {grid_layout['scale_factor']:.2f})")
             
             # Create canvas
             canvas = Image.new('RGB', (canvas_width, canvas_height), (255, 255, 255))
@@ -633,13 +713,10 @@ class VideoGifConverter(GifConverterInterface):
             info_size = max(10, int(14 * font_scale))
             timestamp_size = max(8, int(12 * font_scale))
             
-            # Load fonts
-            try:
-                title_font = ImageFont.truetype("arial.ttf", title_size)
-                info_font = ImageFont.truetype("arial.ttf", info_size)
-                timestamp_font = ImageFont.truetype("arial.ttf", timestamp_size) 
-            except:
-                title_font = info_font = timestamp_font = ImageFont.load_default()
+            # Load fonts (cached per size across grids)
+            title_font = _load_font(title_size)
+            info_font = _load_font(info_size)
+            timestamp_font = _load_font(timestamp_size)
             
             # Draw header with media info
             y = 15
@@ -662,64 +739,79 @@ class VideoGifConverter(GifConverterInterface):
                 draw.text((int(15 * font_scale), y), line, fill=(64,64,64), font=info_font)
                 y += int(20 * font_scale)
             
-            # Paste thumbnails
-            for i, thumb_file in enumerate(thumb_files[:grid_size*grid_size]):
-                if not os.path.exists(thumb_file):
-                    print(f"Warning: Thumbnail file not found: {thumb_file}")
-                    continue
-                    
-                row, col = divmod(i, cols)
-                x, y = col * thumb_width, row * thumb_height + header_height
+            grid_files = thumb_files[:grid_size*grid_size]
+            
+            # Overlay label metrics: timestamps share one digit format and "#N" is the widest
+            # frame number, so one measurement each sizes every label in the grid
+            timestamp_texts = [self._get_thumbnail_timestamp(i, intervals) for i in range(len(grid_files))]
+            timestamp_width = self._get_text_size(draw, max(timestamp_texts, key=len), timestamp_font)[0]
+            frame_width = self._get_text_size(draw, f"#{len(grid_files)}", info_font)[0]
+            label_height = max(10, int(14 * font_scale))
+            label_margin = int(5 * font_scale)
+            frame_margin = int(8 * font_scale)
+            # Label offsets within a cell are the same for every thumbnail
+            timestamp_dy = thumb_height - label_height - label_margin
+            frame_dx = thumb_width - frame_width - frame_margin
+            
+            # Decode and resize thumbnails concurrently (PIL releases the GIL while doing so)
+            # and paste each one as soon as it and the tiles before it are ready
+            with ThreadPoolExecutor(options.max_parallel if options else None) as executor:
+                thumbs = executor.map(
+                    lambda thumb_file: self._load_grid_thumbnail(thumb_file, thumb_width, thumb_height),
+                    grid_files
+                )
                 
-                try:
-                    thumb = Image.open(thumb_file)
-                    # ✅ NEW: Use calculated thumbnail dimensions
-                    thumb = thumb.resize((thumb_width, thumb_height), Image.Resampling.LANCZOS)
-                    canvas.paste(thumb, (x, y))
-                    thumb.close()
+                for i, (thumb_file, thumb) in enumerate(zip(grid_files, thumbs)):
+                    if thumb is None:
+                        continue
                     
-                    # ✅ NEW: Scale timestamp and frame number positioning
-                    timestamp_text = self._get_thumbnail_timestamp(i, intervals)
+                    row, col = divmod(i, cols)
+                    x, y = col * thumb_width, row * thumb_height + header_height
+                
+                    try:
+                        canvas.paste(thumb, (x, y))
+                        thumb.close()
                     
-                    # Calculate text sizes
-                    timestamp_width = len(timestamp_text) * max(6, int(7 * font_scale))
-                    timestamp_height = max(10, int(14 * font_scale))
+                        # ✅ NEW: Scale timestamp and frame number positioning
+                        timestamp_text = timestamp_texts[i]
                     
-                    # Position timestamp at bottom-left
-                    timestamp_x = x + int(5 * font_scale)
-                    timestamp_y = y + thumb_height - timestamp_height - int(5 * font_scale)
+                        # Position timestamp at bottom-left
+                        timestamp_x = x + label_margin
+                        timestamp_y = y + timestamp_dy
                     
-                    # Draw timestamp background and text
-                    draw.rectangle([
-                        timestamp_x - 2, timestamp_y - 1,
-                        timestamp_x + timestamp_width + 2, timestamp_y + timestamp_height + 1
-                    ], fill=(0, 0, 0))
+                        # Draw timestamp background and text
+                        draw.rectangle([
+                            timestamp_x - 2, timestamp_y - 1,
+                            timestamp_x + timestamp_width + 2, timestamp_y + label_height + 1
+                        ], fill=(0, 0, 0))
                     
-                    draw.text((timestamp_x, timestamp_y), timestamp_text, 
-                            fill=(255, 255, 255), font=timestamp_font)
+                        draw.text((timestamp_x, timestamp_y), timestamp_text, 
+                                fill=(255, 255, 255), font=timestamp_font)
                     
-                    # Frame number in top-right
-                    frame_text = f"#{i+1}"
-                    frame_width = len(frame_text) * max(6, int(8 * font_scale))
-                    frame_height = max(10, int(14 * font_scale))
+                        # Frame number in top-right
+                        frame_text = f"#{i+1}"
                     
-                    frame_x = x + thumb_width - frame_width - int(8 * font_scale)
-                    frame_y = y + int(5 * font_scale)
+                        frame_x = x + frame_dx
+                        frame_y = y + label_margin
                     
-                    draw.rectangle([
-                        frame_x - 2, frame_y - 1,
-                        frame_x + frame_width + 2, frame_y + frame_height + 1
-                    ], fill=(0, 100, 200))
+                        draw.rectangle([
+                            frame_x - 2, frame_y - 1,
+                            frame_x + frame_width + 2, frame_y + label_height + 1
+                        ], fill=(0, 100, 200))
                     
-                    draw.text((frame_x, frame_y), frame_text, 
-                            fill=(255, 255, 255), font=info_font)
+                        draw.text((frame_x, frame_y), frame_text, 
+                                fill=(255, 255, 255), font=info_font)
                     
-                except Exception as e:
-                    print(f"Warning: Failed to process thumbnail {thumb_file}: {e}")
-                    continue
+                    except Exception as e:
+                        print(f"Warning: Failed to process thumbnail {thumb_file}: {e}")
+                        continue
             
-            # Save grid image with high quality
-            canvas.save(output_file, 'PNG', quality=95, optimize=True)
+            if output_file.lower().endswith('.webp'):
+                canvas.save(output_file, 'WEBP', quality=GRID_WEBP_QUALITY, method=GRID_WEBP_METHOD)
+            else:
+                # Save grid image losslessly; a low zlib level keeps large grids fast to write
+                compress_level = options.grid_compress_level if options else 1
+                canvas.save(output_file, 'PNG', compress_level=compress_level)
             canvas.close()
             return output_file
             
@@ -727,14 +819,44 @@ class VideoGifConverter(GifConverterInterface):
             print(f"Grid creation failed: {e}")
             return None
         
+    def _load_grid_thumbnail(self, thumb_file: str, thumb_width: int, thumb_height: int) -> Optional["Image.Image"]:
+        """Load a thumbnail resized to its grid cell, or None if it cannot be read"""
+        if not os.path.exists(thumb_file):
+            print(f"Warning: Thumbnail file not found: {thumb_file}")
+            return None
+        
+        try:
+            if PYVIPS_AVAILABLE:
+                # libvips decodes and shrinks in one streaming pass
+                thumb = pyvips.Image.thumbnail(thumb_file, thumb_width, height=thumb_height, size="force")
+                thumb = thumb.colourspace("srgb")[:3].cast("uchar")
+                return Image.frombytes("RGB", (thumb.width, thumb.height), thumb.write_to_memory())
+            
+            with Image.open(thumb_file) as thumb:
+                # ✅ NEW: Use calculated thumbnail dimensions; reducing_gap shrinks
+                # full-resolution frames by box reduction before the LANCZOS pass
+                return thumb.resize((thumb_width, thumb_height), Image.Resampling.LANCZOS,
+                                    reducing_gap=GRID_REDUCING_GAP)
+        except Exception as e:
+            print(f"Warning: Failed to process thumbnail {thumb_file}: {e}")
+            return None
+    
     def _get_text_size(self, draw, text: str, font) -> Tuple[int, int]:
-        """Safely get text dimensions with fallback methods"""
+        """Safely get text dimensions with fallback methods, memoized per (font, text)"""
+        key = (font, text)
+        size = self._text_sizes.get(key)
+        if size is None:
+            size = self._text_sizes[key] = self._measure_text(draw, text, font)
+        return size
+    
+    def _measure_text(self, draw, text: str, font) -> Tuple[int, int]:
+        """Measure text dimensions with fallback methods"""
         try:
             # Method 1: Try textbbox (PIL 8.0.0+)
             bbox = draw.textbbox((0, 0), text, font=font)
             if bbox is not None and len(bbox) >= 4:
-                width = bbox - bbox
-                height = bbox - bbox
+                width = bbox[2] - bbox[0]
+                height = bbox[3] - bbox[1]
                 return (width, height)
         except (AttributeError, TypeError, ValueError):
             pass
@@ -747,8 +869,9 @@ class VideoGifConverter(GifConverterInterface):
             pass
         
         # Method 3: Fallback estimation
-        char_width = 8 if font == ImageFont.load_default() else 10
-        char_height = 12 if font == ImageFont.load_default() else 14
+        is_default = font is _default_font()
+        char_width = 8 if is_default else 10
+        char_height = 12 if is_default else 14
         
         return (len(text) * char_width, char_height)
     
@@ -771,11 +894,12 @@ class VideoGifConverter(GifConverterInterface):
 
     def _format_file_size(self, bytes_size: int) -> str:
         """Format bytes to readable size"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if bytes_size < 1024:
-                return f"{bytes_size:.1f} {unit}"
-            bytes_size /= 1024
-        return f"{bytes_size:.1f} TB"
+        # Negative sizes stay in bytes, as in the division loop this replaced
+        if bytes_size < 1024:
+            return f"{bytes_size:.1f} B"
+        # Each unit spans 10 bits, so the bit length picks the unit without a division loop
+        unit_index = min(len(FILE_SIZE_UNITS) - 1, (int(bytes_size).bit_length() - 1) // 10)
+        return f"{bytes_size / (1 << (10 * unit_index)):.1f} {FILE_SIZE_UNITS[unit_index]}"
 
     def _error_result(self, message: str, start_time: float) -> GifResult:
         """Create error result"""
@@ -788,11 +912,9 @@ class VideoGifConverter(GifConverterInterface):
             processing_time=time.time() - start_time
         )
     
-    def _calculate_grid_layout(self, thumb_files: List[str], grid_size: int, 
-                         options: Optional[AutoGifOptions] = None) -> Dict[str, int]:
+    def _calculate_grid_layout(self, num_files: int, grid_size: int, 
+                         options: Optional[AutoGifOptions] = None) -> Dict[str, float]:
         """Calculate optimal grid layout with resolution control"""
-        num_files = len(thumb_files)
-        
         # Calculate grid dimensions
         cols = min(grid_size, num_files)
         rows = (num_files + cols - 1) // cols
@@ -805,29 +927,69 @@ class VideoGifConverter(GifConverterInterface):
             # Default thumbnail dimensions
             thumb_width = 160
             thumb_height = 90
+        header_height = 150
+        
+        # Apply maximum grid size limits, scaling thumbnails and header together
+        canvas_width = cols * thumb_width
+        canvas_height = rows * thumb_height + header_height
+        scale_factor = 1.0
+        if options and (canvas_width > options.grid_max_width or canvas_height > options.grid_max_height):
+            scale_factor = min(
+                options.grid_max_width / canvas_width,
+                options.grid_max_height / canvas_height
+            )
+            thumb_width = int(thumb_width * scale_factor)
+            thumb_height = int(thumb_height * scale_factor)
+            header_height = int(header_height * scale_factor)
         
         return {
             'cols': cols,
             'rows': rows,
             'thumb_width': thumb_width,
-            'thumb_height': thumb_height
+            'thumb_height': thumb_height,
+            'header_height': header_height,
+            'scale_factor': scale_factor
         }
 
+@functools.lru_cache(maxsize=None)
+def _default_font():
+    """PIL's default font, loaded once"""
+    return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=None)
+def _load_font(size: int):
+    """Grid font of the given size, falling back to PIL's default font"""
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        return _default_font()
+
+def _interval_starts(count: int, step: float) -> List[float]:
+    """Evenly spaced start times, each computed directly so no error accumulates"""
+    if NUMPY_AVAILABLE and count >= NUMPY_MIN_INTERVALS:
+        return (np.arange(count) * step).tolist()
+    return [i * step for i in range(count)]
+
+def _remove_palettes(palette_cache: Dict[Tuple[str, int, int, str], str]) -> None:
+    """Delete cached palette files and empty the cache"""
+    for palette_file in palette_cache.values():
+        FileManager.delete_file(palette_file)
+    palette_cache.clear()
+
 # Convenience functions
 def create_gif_clips(source_file: str, total_duration: float, num_clips: int,
                     clip_duration: float, output_name: str = "clip", **kwargs) -> GifResult:
     """Legacy function for backward compatibility (traditional workflow)"""
-    converter = VideoGifConverter()
-    interval_step = total_duration / num_clips
-    intervals = [(i * interval_step, min((i * interval_step) + clip_duration, total_duration))
-                for i in range(num_clips)]
+    converter = VideoGifConverter(get_default_wrapper())
+    starts = _interval_starts(num_clips, total_duration / num_clips)
+    intervals = [(start, min(start + clip_duration, total_duration)) for start in starts]
     return converter.create_gif_from_intervals(source_file, intervals, output_name, **kwargs)
 
 
 def create_auto_gif_clips(source_file: str, num_clips: int, gif_duration: float, 
                          time_gap: float, output_name: str = "auto_clip", **kwargs) -> GifResult:
     """Enhanced auto-generation with time gaps (NEW video-first workflow)"""
-    converter = VideoGifConverter()
+    converter = VideoGifConverter(get_default_wrapper())
     options = AutoGifOptions(
         source_file=source_file, num_clips=num_clips, gif_duration=gif_duration,
         time_gap=time_gap, output_name=output_name, **kwargs
@@ -845,5 +1007,5 @@ def create_one_click_gif(source_file: str, output_name: str = "oneclick") -> Gif
     Returns:
         GifResult with final GIF and thumbnail grid
     """
-    converter = VideoGifConverter()
+    converter = VideoGifConverter(get_default_wrapper())
     return converter.create_one_click_gif(source_file, output_name)
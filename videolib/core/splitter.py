@@ -1,11 +1,13 @@
 """
 Video splitter with OOP design
 """
+import os
 import uuid
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 from ..utils import FileManager, FormatParser, InputValidator, ValidationError
-from .ffmpeg_wrapper import FFmpegWrapper, SegmentCommand
+from .ffmpeg_wrapper import FFmpegWrapper, SegmentCommand, get_default_wrapper
 
 @dataclass
 class SplitOptions:
@@ -16,6 +18,8 @@ class SplitOptions:
     max_size_bytes: int
     safety_factor: float = 0.95
     max_rounds: int = 4
+    max_parallel: Optional[int] = None  # Concurrent ffmpeg processes (default: CPU count)
+    probe_segments: bool = True  # False estimates oversized segment durations instead of probing them
 
 @dataclass 
 class SplitResult:
@@ -25,12 +29,15 @@ class SplitResult:
     oversized_files: List[str] = None
     was_copied: bool = False
     error_message: Optional[str] = None
+    file_sizes: Dict[str, int] = None  # Size in bytes of every output and oversized file
 
     def __post_init__(self):
         if self.output_files is None:
             self.output_files = []
         if self.oversized_files is None:
             self.oversized_files = []
+        if self.file_sizes is None:
+            self.file_sizes = {}
 
 class VideoSplitter:
     """Video splitter class"""
@@ -41,18 +48,19 @@ class VideoSplitter:
     def split_by_size(self, options: SplitOptions) -> SplitResult:
         """Split video by file size"""
         # Validate inputs
+        source_stat = FileManager.stat_or_none(options.source_file)
         try:
-            self._validate_options(options)
+            self._validate_options(options, source_stat)
         except ValidationError as e:
             return SplitResult(success=False, error_message=str(e))
         
         # Check if file is already small enough
-        source_size = FileManager.get_file_size(options.source_file)
+        source_size = source_stat.st_size
         if source_size <= options.max_size_bytes:
-            return self._copy_file(options)
+            return self._copy_file(options, source_size)
         
         # Get media info
-        probe_result = self.ffmpeg.probe_media(options.source_file)
+        probe_result = self.ffmpeg.probe_media(options.source_file, source_stat)
         if not probe_result.success:
             return SplitResult(success=False, error_message=probe_result.error_message)
         
@@ -65,11 +73,11 @@ class VideoSplitter:
         segment_duration = max(0.5, (options.max_size_bytes / bytes_per_sec) * options.safety_factor)
         
         # Execute segmentation
-        return self._perform_segmentation(options, segment_duration)
+        return self._perform_segmentation(options, segment_duration, duration)
     
-    def _validate_options(self, options: SplitOptions) -> None:
+    def _validate_options(self, options: SplitOptions, source_stat: Optional[os.stat_result]) -> None:
         """Validate split options"""
-        if not FileManager.get_file_size(options.source_file):
+        if source_stat is None or source_stat.st_size == 0:
             raise ValidationError(f"Source file not found: {options.source_file}")
         
         if options.max_size_bytes <= 0:
@@ -81,7 +89,7 @@ class VideoSplitter:
         if not options.output_extension.strip():
             raise ValidationError("Output extension cannot be empty")
     
-    def _copy_file(self, options: SplitOptions) -> SplitResult:
+    def _copy_file(self, options: SplitOptions, source_size: int) -> SplitResult:
         """Copy file when it's already under size limit"""
         dest_path = f"{options.output_name}.{options.output_extension}"
         
@@ -89,7 +97,8 @@ class VideoSplitter:
             return SplitResult(
                 success=True,
                 output_files=[dest_path],
-                was_copied=True
+                was_copied=True,
+                file_sizes={dest_path: source_size}
             )
         else:
             return SplitResult(
@@ -97,76 +106,128 @@ class VideoSplitter:
                 error_message="Failed to copy file"
             )
     
-    def _perform_segmentation(self, options: SplitOptions, segment_duration: float) -> SplitResult:
+    def _perform_segmentation(self, options: SplitOptions, segment_duration: float,
+                              input_duration: Optional[float] = None) -> SplitResult:
         """Perform FFmpeg segmentation"""
         # Build output pattern
         pattern_keyword = '%03d'
         pattern = f"{options.output_name}_{pattern_keyword}.{options.output_extension}"
         
         # Execute segment command
-        segment_cmd = SegmentCommand(self.ffmpeg, options.source_file, pattern, pattern_keyword, segment_duration)
+        segment_cmd = SegmentCommand(self.ffmpeg, options.source_file, pattern, pattern_keyword,
+                                     segment_duration, input_duration)
         result = segment_cmd.execute()
         
         if not result.success:
             return SplitResult(success=False, error_message=result.error_message)
 
         # Process segments for oversized files
-        return self._process_segments(result.output_files, options)
+        return self._process_segments(result.output_files, options, segment_duration, input_duration)
     
-    def _process_segments(self, segments: List[str], options: SplitOptions) -> SplitResult:
+    def _process_segments(self, segments: List[str], options: SplitOptions,
+                          segment_duration: Optional[float] = None,
+                          input_duration: Optional[float] = None) -> SplitResult:
         """Process segments, splitting oversized ones"""
         final_files = []
         oversized_files = []
+        oversized_segments = []
+        file_sizes = {}
         
-        for segment in segments:
-            segment_size = FileManager.get_file_size(segment)
+        if not options.probe_segments and segment_duration and input_duration:
+            durations = self._estimate_durations(len(segments), segment_duration, input_duration)
+        else:
+            durations = [None] * len(segments)
+        
+        for segment, duration in zip(segments, durations):
+            segment_stat = FileManager.stat_or_none(segment)
+            if segment_stat is None:
+                continue
             
-            if segment_size <= options.max_size_bytes:
+            if segment_stat.st_size <= options.max_size_bytes:
                 final_files.append(segment)
+                file_sizes[segment] = segment_stat.st_size
             else:
-                # Try to split oversized segment
-                split_files = self._split_oversized_segment(
-                    segment, options.max_size_bytes, options.max_rounds
-                )
-                
-                # Remove original oversized file
+                oversized_segments.append((segment, segment_stat, duration))
+        
+        # Try to split oversized segments; each is independent, so they probe and split in parallel
+        split_results = []
+        if oversized_segments:
+            max_workers = min(len(oversized_segments), options.max_parallel or os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                split_results = list(executor.map(
+                    lambda oversized: self._split_oversized_segment(
+                        oversized[0], options.max_size_bytes, options.max_rounds, oversized[1],
+                        oversized[2], options.probe_segments
+                    ),
+                    oversized_segments
+                ))
+        
+        for (segment, _, _), split_files in zip(oversized_segments, split_results):
+            # Remove original oversized file, unless it could not be split and is the result
+            if [split_file for split_file, _ in split_files] != [segment]:
                 FileManager.delete_file(segment)
-                
-                # Check results
-                for split_file in split_files:
-                    split_size = FileManager.get_file_size(split_file)
-                    if split_size <= options.max_size_bytes:
-                        final_files.append(split_file)
-                    else:
-                        oversized_files.append(split_file)
+            
+            # Check results
+            for split_file, split_size in split_files:
+                if split_size is None:
+                    continue
+                file_sizes[split_file] = split_size
+                if split_size <= options.max_size_bytes:
+                    final_files.append(split_file)
+                else:
+                    oversized_files.append(split_file)
         
         # Handle single file case
         if len(final_files) == 1 and not oversized_files:
             final_name = f"{options.output_name}.{options.output_extension}"
             if FileManager.move_file(final_files[0], final_name):
+                file_sizes[final_name] = file_sizes.pop(final_files[0])
                 final_files = [final_name]
         
         return SplitResult(
             success=True,
             output_files=sorted(final_files),
-            oversized_files=sorted(oversized_files)
+            oversized_files=sorted(oversized_files),
+            file_sizes=file_sizes
         )
     
-    def _split_oversized_segment(self, segment_path: str, max_size: int, max_rounds: int) -> List[str]:
-        """Split an oversized segment recursively"""
-        if max_rounds <= 0:
-            return [segment_path]
-        
-        # Get segment info
-        probe_result = self.ffmpeg.probe_media(segment_path)
-        if not probe_result.success or not probe_result.media_info.duration:
-            return [segment_path]
+    @staticmethod
+    def _estimate_durations(count: int, segment_duration: float,
+                            total_duration: float) -> List[Optional[float]]:
+        """Nominal durations of count segments cut every segment_duration seconds"""
+        if count <= 0:
+            return []
+        # Keyframe cuts move the boundaries, so these are estimates; the last piece takes the remainder
+        remainder = total_duration - segment_duration * (count - 1)
+        return [segment_duration] * (count - 1) + [remainder if remainder > 0 else None]
+    
+    def _split_oversized_segment(self, segment_path: str, max_size: int, max_rounds: int,
+                                 segment_stat: Optional[os.stat_result] = None,
+                                 known_duration: Optional[float] = None,
+                                 probe: bool = True) -> List[Tuple[str, Optional[int]]]:
+        """Split an oversized segment recursively, returning each piece with its size
         
-        duration = probe_result.media_info.duration
-        current_size = FileManager.get_file_size(segment_path)
+        With probe False, pieces get the durations their cut points imply
+        instead of an ffprobe run each; a piece split from an estimate that is
+        still oversized is probed on the next round.
+        """
+        # Check the size before paying for a probe
+        if segment_stat is None:
+            segment_stat = FileManager.stat_or_none(segment_path)
+        if segment_stat is None:
+            return [(segment_path, None)]
+        current_size = segment_stat.st_size
+        if max_rounds <= 0 or current_size <= max_size:
+            return [(segment_path, current_size)]
         
-        if current_size <= max_size:
-            return [segment_path]
+        # Get segment info
+        if known_duration:
+            duration = known_duration
+        else:
+            probe_result = self.ffmpeg.probe_media(segment_path, segment_stat)
+            if not probe_result.success or not probe_result.media_info.duration:
+                return [(segment_path, current_size)]
+            duration = probe_result.media_info.duration
         
         # Calculate new segment duration
         bytes_per_sec = current_size / duration
@@ -180,16 +241,23 @@ class VideoSplitter:
         temp_pattern = f"{base_name}_sub_{unique_id}_{pattern_keyword}.{extension}"
         
         # Execute segmentation
-        segment_cmd = SegmentCommand(self.ffmpeg, segment_path, temp_pattern, pattern_keyword, new_duration)
+        segment_cmd = SegmentCommand(self.ffmpeg, segment_path, temp_pattern, pattern_keyword,
+                                     new_duration, duration)
         result = segment_cmd.execute()
         
         if not result.success:
-            return [segment_path]
+            return [(segment_path, current_size)]
+        
+        # Recursively process new segments; only probed durations are trusted for estimates
+        if not probe and not known_duration:
+            durations = self._estimate_durations(len(result.output_files), new_duration, duration)
+        else:
+            durations = [None] * len(result.output_files)
         
-        # Recursively process new segments
         final_segments = []
-        for new_segment in result.output_files:
-            sub_segments = self._split_oversized_segment(new_segment, max_size, max_rounds - 1)
+        for new_segment, new_segment_duration in zip(result.output_files, durations):
+            sub_segments = self._split_oversized_segment(new_segment, max_size, max_rounds - 1,
+                                                         known_duration=new_segment_duration, probe=probe)
             final_segments.extend(sub_segments)
         
         return final_segments
@@ -199,7 +267,7 @@ def split_video_by_size(source_file: str, output_name: str, output_extension: st
                        max_size_bytes: int, safety_factor: float = 0.95, 
                        max_rounds: int = 4) -> Dict[str, Any]:
     """Split video by size - backward compatible function"""
-    splitter = VideoSplitter()
+    splitter = VideoSplitter(get_default_wrapper())
     options = SplitOptions(
         source_file=source_file,
         output_name=output_name,
@@ -214,5 +282,6 @@ def split_video_by_size(source_file: str, output_name: str, output_extension: st
         "files": result.output_files,
         "overs": result.oversized_files,
         "copied": result.was_copied,
-        "renamed_single_to": result.output_files[0] if len(result.output_files) == 1 else None
+        "renamed_single_to": result.output_files[0] if len(result.output_files) == 1 else None,
+        "sizes": result.file_sizes
     }
@@ -2,6 +2,7 @@
 Main video processor that orchestrates all operations
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Union, List, Tuple
 from dataclasses import dataclass
 
@@ -143,44 +144,23 @@ class VideoProcessor:
         """One-click video to GIF conversion with automatic optimal settings"""
         return self.gif_converter.create_one_click_gif(source_file, output_name)
     
-    def process_batch(self, tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Process multiple tasks in sequence"""
-        results = []
-        for i, task in enumerate(tasks):
-            task_type = task.get('type')
-            task_params = task.get('parameters', {})
-
-            try:
-                if task_type == 'download':
-                    result = self.download_video(**task_params)
-                elif task_type == 'split':
-                    result = self.split_video_by_size(**task_params)
-                elif task_type == 'clip':
-                    result = self.create_clips(**task_params)
-                elif task_type == 'gif':
-                    # Support both old and new GIF creation methods
-                    if 'gif_duration' in task_params and 'time_gap' in task_params:
-                        result = self.create_auto_gif_clips(**task_params)
-                    else:
-                        result = self.create_gif_clips(**task_params)
-                else:
-                    result = {'success': False, 'error_message': f'Unknown task type: {task_type}'}
-
-                results.append({
-                    'task_index': i,
-                    'task_type': task_type,
-                    'result': result
-                })
-
-            except Exception as e:
-                results.append({
-                    'task_index': i,
-                    'task_type': task_type,
-                    'result': {'success': False, 'error_message': str(e)}
-                })
+    def process_batch(self, tasks: List[Dict[str, Any]], max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """Process multiple tasks, concurrently when max_workers is greater than 1
+        
+        Concurrent tasks must be independent: no task may read a file another
+        task writes (download-then-split templates and WorkflowBuilder chains
+        do), and no two tasks may share an output_name. Leave max_workers
+        unset for such batches so tasks run in order.
+        """
+        if max_workers and max_workers > 1 and len(tasks) > 1:
+            # The caller vouches the tasks are independent; they mostly wait on ffmpeg, and map keeps task order
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+                results = list(executor.map(self._run_task, range(len(tasks)), tasks))
+        else:
+            results = [self._run_task(i, task) for i, task in enumerate(tasks)]
 
         # Calculate summary
-        successful = sum(1 for r in results if getattr(r['result'], 'success', r['result'].get('success', False)))
+        successful = sum(1 for r in results if self._task_succeeded(r['result']))
 
         return {
             'results': results,
@@ -190,6 +170,43 @@ class VideoProcessor:
             'success_rate': (successful / len(tasks)) * 100 if tasks else 0
         }
 
+    def _run_task(self, task_index: int, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a single batch task, capturing any error in its result"""
+        task_type = task.get('type')
+        task_params = task.get('parameters', {})
+
+        try:
+            if task_type == 'download':
+                result = self.download_video(**task_params)
+            elif task_type == 'split':
+                result = self.split_video_by_size(**task_params)
+            elif task_type == 'clip':
+                result = self.create_clips(**task_params)
+            elif task_type == 'gif':
+                # Support both old and new GIF creation methods
+                if 'gif_duration' in task_params and 'time_gap' in task_params:
+                    result = self.create_auto_gif_clips(**task_params)
+                else:
+                    result = self.create_gif_clips(**task_params)
+            else:
+                result = {'success': False, 'error_message': f'Unknown task type: {task_type}'}
+
+        except Exception as e:
+            result = {'success': False, 'error_message': str(e)}
+
+        return {
+            'task_index': task_index,
+            'task_type': task_type,
+            'result': result
+        }
+
+    @staticmethod
+    def _task_succeeded(result: Any) -> bool:
+        """Read success from either a result object or a result dict"""
+        if isinstance(result, dict):
+            return result.get('success', False)
+        return getattr(result, 'success', False)
+
 
 # Factory function for easy instantiation
 def create_video_processor(ffmpeg_path: str = "ffmpeg", ffprobe_path: str = "ffprobe") -> VideoProcessor:
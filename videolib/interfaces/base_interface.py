@@ -7,6 +7,8 @@ from typing import Any, Dict, List, Optional
 class VideoOperation(ABC):
     """Abstract base class for video operations"""
     
+    __slots__ = ()
+    
     @abstractmethod
     def execute(self) -> Any:
         """Execute the operation"""
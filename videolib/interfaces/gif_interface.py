@@ -21,6 +21,9 @@ class GifOptions:
     loop_count: int = 0  # 0 = infinite loop
     create_thumbnails: bool = True
     thumbnail_extension: str = "png"
+    max_parallel: Optional[int] = None  # Concurrent ffmpeg processes (default: CPU count)
+    fast_seek: bool = True  # Seek on the input rather than decoding up to each interval
+    palette_sample_fps: Optional[float] = 1.0  # Frames per second fed to palettegen (None: every GIF frame)
 
 @dataclass
 class GifResult:
@@ -55,6 +58,10 @@ class AutoGifOptions:
     grid_thumb_height: int = 90    
     grid_max_width: int = 1920 
     grid_max_height: int = 1080
+    grid_compress_level: int = 1  # PNG zlib level for the grid, 0-9 (higher: smaller but slower)
+    grid_format: str = "png"  # png (lossless) or webp (smaller, lossy)
+    single_pass_palette: bool = False  # High quality: one decode, but holds every GIF frame in memory
+    max_parallel: Optional[int] = None  # Concurrent ffmpeg processes (default: CPU count)
 
 class GifConverterInterface(ABC):
     """Abstract interface for GIF conversion operations"""
@@ -2,12 +2,15 @@
 Task-specific interfaces for video processing
 """
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, List, Optional
 from .base_interface import VideoOperation, ResultHandler, ProgressReporter
 
 class DownloadOperation(VideoOperation):
     """Download operation interface"""
     
+    __slots__ = ('url', 'output_path')
+    
     def __init__(self, url: str, output_path: str):
         self.url = url
         self.output_path = output_path
@@ -24,6 +27,8 @@ class DownloadOperation(VideoOperation):
 class SplitOperation(VideoOperation):
     """Split operation interface"""
     
+    __slots__ = ('source_file', 'output_name', 'max_size')
+    
     def __init__(self, source_file: str, output_name: str, max_size: int):
         self.source_file = source_file
         self.output_name = output_name
@@ -41,6 +46,8 @@ class SplitOperation(VideoOperation):
 class ClipOperation(VideoOperation):
     """Clip operation interface"""
     
+    __slots__ = ('source_file', 'output_name', 'intervals')
+    
     def __init__(self, source_file: str, output_name: str, intervals: List[Dict[str, Any]]):
         self.source_file = source_file
         self.output_name = output_name
@@ -58,6 +65,8 @@ class ClipOperation(VideoOperation):
 class BatchProcessor(ABC):
     """Interface for batch processing multiple operations"""
     
+    max_workers: Optional[int] = None  # Operations run_operations executes at once (None: one at a time)
+    
     @abstractmethod
     def add_operation(self, operation: VideoOperation) -> None:
         """Add operation to batch"""
@@ -72,6 +81,32 @@ class BatchProcessor(ABC):
     def clear_batch(self) -> None:
         """Clear all operations from batch"""
         pass
+    
+    def run_operations(self, operations: List[VideoOperation],
+                       progress_reporter: Optional[ProgressReporter] = None) -> List[Any]:
+        """Execute operations for execute_batch, returning their results in operation order
+        
+        Operations mostly wait on the network or on ffmpeg processes, so with
+        max_workers above 1 they run on a thread pool; progress is reported as
+        each one finishes.
+        """
+        results: List[Any] = [None] * len(operations)
+        
+        if self.max_workers and self.max_workers > 1 and len(operations) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(operations))) as executor:
+                futures = {executor.submit(operation.execute): index for index, operation in enumerate(operations)}
+                for step, future in enumerate(as_completed(futures), 1):
+                    index = futures[future]
+                    results[index] = future.result()
+                    if progress_reporter:
+                        progress_reporter.report_progress(step, f"Operation {index + 1} finished")
+        else:
+            for index, operation in enumerate(operations):
+                results[index] = operation.execute()
+                if progress_reporter:
+                    progress_reporter.report_progress(index + 1, f"Operation {index + 1} finished")
+        
+        return results
 
 class TaskFactory(ABC):
     """Factory interface for creating video operations"""
@@ -1,10 +1,35 @@
 """
 File utility functions for video processing
 """
+import errno
+import hashlib
 import os
 import shutil
-from typing import List, Optional
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+from .format_utils import parse_url
+
+# Absolute paths of directories this process already created or found; makedirs is skipped for them
+_ENSURED_DIRECTORIES: Set[str] = set()
+ENSURED_DIRECTORIES_LIMIT = 4096
+
+def _ensure_directory(path: str) -> None:
+    """Create a directory unless this process already ensured it, raising OSError on failure"""
+    key = os.path.abspath(path)
+    if key in _ENSURED_DIRECTORIES:
+        return
+    os.makedirs(path, exist_ok=True)
+    if len(_ENSURED_DIRECTORIES) >= ENSURED_DIRECTORIES_LIMIT:
+        _ENSURED_DIRECTORIES.clear()
+    _ENSURED_DIRECTORIES.add(key)
+
+def _forget_directory(path: str) -> bool:
+    """Drop a directory from the ensured set, returning whether it was there"""
+    key = os.path.abspath(path)
+    if key in _ENSURED_DIRECTORIES:
+        _ENSURED_DIRECTORIES.discard(key)
+        return True
+    return False
 
 class FileManager:
     """File management utilities"""
@@ -13,7 +38,7 @@ class FileManager:
     def ensure_directory(path: str) -> bool:
         """Ensure directory exists, create if necessary"""
         try:
-            os.makedirs(path, exist_ok=True)
+            _ensure_directory(path)
             return True
         except OSError:
             return False
@@ -24,48 +49,93 @@ class FileManager:
         if not extension.startswith('.'):
             extension = '.' + extension
         
-        base_name = base_path
-        counter = 1
+        # One stat settles the common case; on a conflict, one directory listing beats probing suffixes
+        if not os.path.exists(base_path + extension):
+            return base_path
+        return FileManager.get_unique_filenames([base_path], extension)[0]
+    
+    @staticmethod
+    def get_unique_filenames(base_paths: List[str], extension: str) -> List[str]:
+        """Generate unique filenames for several outputs with one directory scan per folder"""
+        if not extension.startswith('.'):
+            extension = '.' + extension
+        
+        taken: Dict[str, Set[str]] = {}
+        unique = []
         
-        while os.path.exists(base_name + extension):
-            # Try with counter suffix
-            test_name = f"{base_path}_{counter:03d}"
-            if not os.path.exists(test_name + extension):
-                return test_name
-            counter += 1
+        for base_path in base_paths:
+            directory, base_name = os.path.split(base_path)
+            names = taken.get(directory)
+            if names is None:
+                try:
+                    names = set(os.listdir(directory or '.'))
+                except OSError:
+                    names = set()
+                taken[directory] = names
+            
+            # Same suffix scheme as get_unique_filename. The listing is compared case-sensitively,
+            # so each candidate is confirmed with a stat for case-insensitive filesystems
+            chosen = base_name
+            if not FileManager._name_is_free(directory, base_name + extension, names):
+                for counter in range(1, 10000):
+                    test_name = f"{base_name}_{counter:03d}"
+                    if FileManager._name_is_free(directory, test_name + extension, names):
+                        chosen = test_name
+                        break
             
-            # Prevent infinite loop
-            if counter > 9999:
-                break
+            # Reserve the name so later outputs in the batch do not reuse it
+            names.add(chosen + extension)
+            unique.append(os.path.join(directory, chosen))
         
-        return base_name
+        return unique
+    
+    @staticmethod
+    def _name_is_free(directory: str, name: str, names: Set[str]) -> bool:
+        """Whether a file name is not listed, not reserved and not present on disk"""
+        return name not in names and not os.path.exists(os.path.join(directory, name))
     
     @staticmethod
     def copy_file(source: str, destination: str) -> bool:
         """Copy file with error handling"""
+        # Ensure destination directory exists
+        dest_dir = os.path.dirname(destination)
         try:
-            # Ensure destination directory exists
-            dest_dir = os.path.dirname(destination)
             if dest_dir:
-                os.makedirs(dest_dir, exist_ok=True)
+                _ensure_directory(dest_dir)
             
             shutil.copy2(source, destination)
             return True
         except (OSError, shutil.Error):
+            if dest_dir and _forget_directory(dest_dir) and not os.path.isdir(dest_dir):
+                # The directory was removed after it was ensured; create it again once
+                return FileManager.copy_file(source, destination)
             return False
     
     @staticmethod
     def move_file(source: str, destination: str) -> bool:
         """Move/rename file with error handling"""
+        # Ensure destination directory exists
+        dest_dir = os.path.dirname(destination)
         try:
-            # Ensure destination directory exists
-            dest_dir = os.path.dirname(destination)
             if dest_dir:
-                os.makedirs(dest_dir, exist_ok=True)
+                _ensure_directory(dest_dir)
             
-            shutil.move(source, destination)
+            if os.path.isdir(destination):
+                # shutil.move puts the file inside the directory; os.replace would fail or replace it
+                shutil.move(source, destination)
+            else:
+                try:
+                    # A same-filesystem rename is one syscall; shutil.move copies across devices
+                    os.replace(source, destination)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    shutil.move(source, destination)
             return True
         except (OSError, shutil.Error):
+            if dest_dir and _forget_directory(dest_dir) and not os.path.isdir(dest_dir):
+                # The directory was removed after it was ensured; create it again once
+                return FileManager.move_file(source, destination)
             return False
     
     @staticmethod
@@ -85,23 +155,56 @@ class FileManager:
         except OSError:
             return None
     
+    @staticmethod
+    def stat_or_none(file_path: str) -> Optional[os.stat_result]:
+        """Stat a file, returning None if it does not exist"""
+        try:
+            return os.stat(file_path)
+        except OSError:
+            return None
+    
+    @staticmethod
+    def hash_file(file_path: str, algorithm: str = "sha256") -> str:
+        """Hash file contents, returning the hex digest"""
+        with open(file_path, 'rb') as f:
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, algorithm).hexdigest()
+            
+            digest = hashlib.new(algorithm)
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+            return digest.hexdigest()
+    
+    @staticmethod
+    def hash_files(file_paths: List[str], algorithm: str = "sha256",
+                   max_workers: Optional[int] = None) -> Dict[str, str]:
+        """Hash several files concurrently (hashlib releases the GIL on large reads)"""
+        if not file_paths:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=max_workers or min(len(file_paths), os.cpu_count() or 1)) as executor:
+            digests = executor.map(lambda path: FileManager.hash_file(path, algorithm), file_paths)
+            return dict(zip(file_paths, digests))
+    
     @staticmethod
     def list_files_with_pattern(directory: str, prefix: str, extension: str) -> List[str]:
         """List files matching prefix and extension pattern"""
+        suffix = '.' + extension
         try:
-            files = []
-            for file in os.listdir(directory):
-                if file.startswith(prefix) and file.endswith('.' + extension):
-                    files.append(os.path.join(directory, file))
-            return sorted(files)
+            with os.scandir(directory) as entries:
+                files = [entry.path for entry in entries
+                         if entry.name.startswith(prefix) and entry.name.endswith(suffix)]
         except OSError:
             return []
+        
+        files.sort()
+        return files
     
     @staticmethod
     def suggest_filename_from_url(url: str, default: str = "downloaded_video.mp4") -> str:
         """Extract filename from URL or return default"""
         try:
-            parsed = urlparse(url)
+            parsed = parse_url(url)
             basename = os.path.basename(parsed.path)
             if basename and '.' in basename:
                 return basename
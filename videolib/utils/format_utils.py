@@ -1,9 +1,32 @@
 """
 Format and parsing utilities for video processing
 """
+import functools
 import os
 import re
 from typing import Optional, Union
+from urllib.parse import ParseResult, urlparse
+
+# Size strings such as "2GB", "500M" or "1.5K", after upper-casing and removing spaces
+SIZE_PATTERN = re.compile(r'^([0-9]*\.?[0-9]+)(GB?|MB?|KB?|B?)$')
+
+SIZE_MULTIPLIERS = {
+    '': 1,
+    'B': 1,
+    'KB': 1024,
+    'K': 1024,
+    'MB': 1024 ** 2,
+    'M': 1024 ** 2,
+    'GB': 1024 ** 3,
+    'G': 1024 ** 3
+}
+
+FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB')
+
+@functools.lru_cache(maxsize=512)
+def parse_url(url: str) -> ParseResult:
+    """Parse a URL once; validation and filename suggestion see the same URLs"""
+    return urlparse(url)
 
 class FormatParser:
     """Parse various format strings"""
@@ -22,24 +45,14 @@ class FormatParser:
                 return int(size_str)
             
             # Parse with units
-            match = re.match(r'^([0-9]*\.?[0-9]+)(GB?|MB?|KB?|B?)$', size_str)
+            match = SIZE_PATTERN.match(size_str)
             if not match:
                 return None
             
             value = float(match.group(1))
             unit = match.group(2)
             
-            multipliers = {
-                'B': 1,
-                'KB': 1024,
-                'K': 1024,
-                'MB': 1024 ** 2,
-                'M': 1024 ** 2,
-                'GB': 1024 ** 3,
-                'G': 1024 ** 3
-            }
-            
-            return int(value * multipliers.get(unit, 1))
+            return int(value * SIZE_MULTIPLIERS[unit])
             
         except (ValueError, TypeError):
             return None
@@ -60,10 +73,22 @@ class FormatParser:
         
         try:
             # Plain seconds
-            if ':' not in timecode_str:
+            colons = timecode_str.count(':')
+            if colons == 0:
                 return float(timecode_str)
             
-            # HH:MM:SS or MM:SS format
+            # MM:SS and HH:MM:SS with every field present, without building a list
+            if colons == 1:
+                minutes, _, seconds = timecode_str.partition(':')
+                if minutes.strip() and seconds.strip():
+                    return float(minutes) * 60 + float(seconds)
+            elif colons == 2:
+                hours, _, rest = timecode_str.partition(':')
+                minutes, _, seconds = rest.partition(':')
+                if hours.strip() and minutes.strip() and seconds.strip():
+                    return float(hours) * 3600 + float(minutes) * 60 + float(seconds)
+            
+            # Other forms: empty fields are skipped
             parts = [float(p) for p in timecode_str.split(':') if p.strip()]
             
             if len(parts) == 3:  # HH:MM:SS
@@ -97,21 +122,22 @@ class FormatParser:
     @staticmethod
     def format_file_size(size_bytes: int) -> str:
         """Format bytes as human readable string"""
+        # Negative sizes stay in bytes too
         if size_bytes < 1024:
             return f"{size_bytes} B"
-        elif size_bytes < 1024 ** 2:
-            return f"{size_bytes / 1024:.1f} KB"
-        elif size_bytes < 1024 ** 3:
-            return f"{size_bytes / (1024 ** 2):.1f} MB"
-        else:
-            return f"{size_bytes / (1024 ** 3):.1f} GB"
+        # Each unit spans 10 bits, so the bit length picks the unit without comparisons
+        unit_index = min(len(FILE_SIZE_UNITS) - 1, (int(size_bytes).bit_length() - 1) // 10)
+        return f"{size_bytes / (1 << (10 * unit_index)):.1f} {FILE_SIZE_UNITS[unit_index]}"
     
     @staticmethod
     def is_valid_url(url: str) -> bool:
         """Check if string is a valid URL"""
-        if not url:
+        if not url or not url.startswith(('http://', 'https://')):
+            return False
+        try:
+            return bool(parse_url(url).netloc)
+        except ValueError:
             return False
-        return url.startswith(('http://', 'https://'))
     
     @staticmethod
     def normalize_extension(extension: str) -> str:
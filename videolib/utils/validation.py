@@ -2,9 +2,31 @@
 Validation utilities for video processing operations
 """
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple, Dict, Any
 from .format_utils import FormatParser
 
+# Common codecs; others are allowed too, this only separates the familiar ones
+VALID_CODECS = frozenset({
+    'copy', 'libx264', 'libx265', 'h264', 'h265', 'vp8', 'vp9', 'av1',
+    'aac', 'mp3', 'opus', 'vorbis', 'flac', 'pcm'
+})
+
+# Fields each task configuration must provide
+SPLIT_REQUIRED_FIELDS = ('source_file', 'output_name', 'output_extension', 'max_size')
+CLIP_REQUIRED_FIELDS = ('source_file', 'output_name', 'output_extension', 'intervals')
+CODEC_FIELDS = ('video_codec', 'audio_codec')
+
+# Files recently found to exist, mapped to the monotonic time until which that answer is reused;
+# only positive results are kept, so a file created moments later is never reported missing
+_EXISTING_FILES: Dict[str, float] = {}
+FILE_EXISTS_TTL = 2.0
+FILE_EXISTS_CACHE_SIZE = 1024
+
+# Below this many distinct paths, serial stats are cheaper than starting threads
+PARALLEL_EXISTS_MIN_FILES = 8
+
 class ValidationError(Exception):
     """Custom validation error"""
     pass
@@ -15,7 +37,29 @@ class InputValidator:
     @staticmethod
     def validate_file_exists(file_path: str) -> bool:
         """Validate that file exists"""
-        return os.path.isfile(file_path)
+        now = time.monotonic()
+        expires = _EXISTING_FILES.get(file_path)
+        if expires is not None and expires > now:
+            return True
+        
+        if not os.path.isfile(file_path):
+            _EXISTING_FILES.pop(file_path, None)
+            return False
+        
+        if len(_EXISTING_FILES) >= FILE_EXISTS_CACHE_SIZE:
+            _EXISTING_FILES.clear()
+        _EXISTING_FILES[file_path] = now + FILE_EXISTS_TTL
+        return True
+    
+    @staticmethod
+    def validate_files_exist(file_paths: List[str], max_workers: Optional[int] = None) -> Dict[str, bool]:
+        """Check several files at once; stats overlap on a thread pool, which helps on network storage"""
+        unique_paths = list(dict.fromkeys(file_paths))
+        if len(unique_paths) < PARALLEL_EXISTS_MIN_FILES:
+            return {path: InputValidator.validate_file_exists(path) for path in unique_paths}
+        
+        with ThreadPoolExecutor(max_workers=max_workers or min(len(unique_paths), 32)) as executor:
+            return dict(zip(unique_paths, executor.map(InputValidator.validate_file_exists, unique_paths)))
     
     @staticmethod
     def validate_url(url: str) -> bool:
@@ -31,15 +75,10 @@ class InputValidator:
             if output_dir and not os.path.exists(output_dir):
                 os.makedirs(output_dir, exist_ok=True)
             
-            # Test if we can write to the location
-            test_file = output_path + ".tmp"
-            try:
-                with open(test_file, 'w') as f:
-                    f.write("test")
-                os.remove(test_file)
-                return True, None
-            except OSError as e:
-                return False, f"Cannot write to output path: {e}"
+            # Ask the OS whether the directory is writable instead of writing a probe file
+            if not os.access(output_dir or '.', os.W_OK):
+                return False, f"Cannot write to output path: {output_dir or '.'} is not writable"
+            return True, None
                 
         except OSError as e:
             return False, f"Invalid output path: {e}"
@@ -59,14 +98,20 @@ class InputValidator:
     @staticmethod
     def validate_timecode(timecode: str) -> Tuple[bool, Optional[str]]:
         """Validate timecode format"""
+        _, error = InputValidator._parse_timecode_checked(timecode)
+        return error is None, error
+    
+    @staticmethod
+    def _parse_timecode_checked(timecode: str) -> Tuple[Optional[float], Optional[str]]:
+        """Parse a timecode once, returning its seconds or the validation error"""
         parsed = FormatParser.parse_timecode(timecode)
         if parsed is None:
-            return False, f"Invalid timecode format: '{timecode}'. Use formats like 'HH:MM:SS', 'MM:SS', or seconds"
+            return None, f"Invalid timecode format: '{timecode}'. Use formats like 'HH:MM:SS', 'MM:SS', or seconds"
         
         if parsed < 0:
-            return False, "Timecode cannot be negative"
+            return None, "Timecode cannot be negative"
         
-        return True, None
+        return parsed, None
     
     @staticmethod
     def validate_time_intervals(intervals: List[Tuple[str, str]]) -> Tuple[bool, List[str]]:
@@ -74,20 +119,17 @@ class InputValidator:
         errors = []
         
         for i, (start, end) in enumerate(intervals):
-            # Validate individual timecodes
-            start_valid, start_error = InputValidator.validate_timecode(start)
-            if not start_valid:
+            # Validate individual timecodes, keeping the parsed seconds for the ordering check
+            start_sec, start_error = InputValidator._parse_timecode_checked(start)
+            if start_error:
                 errors.append(f"Interval {i+1} start time: {start_error}")
             
-            end_valid, end_error = InputValidator.validate_timecode(end)
-            if not end_valid:
+            end_sec, end_error = InputValidator._parse_timecode_checked(end)
+            if end_error:
                 errors.append(f"Interval {i+1} end time: {end_error}")
             
             # Check start < end
-            if start_valid and end_valid:
-                start_sec = FormatParser.parse_timecode(start)
-                end_sec = FormatParser.parse_timecode(end)
-                
+            if start_error is None and end_error is None:
                 if start_sec >= end_sec:
                     errors.append(f"Interval {i+1}: start time must be less than end time")
         
@@ -100,12 +142,7 @@ class InputValidator:
             return False, "Codec cannot be empty"
         
         # Basic validation - allow common codecs
-        valid_codecs = {
-            'copy', 'libx264', 'libx265', 'h264', 'h265', 'vp8', 'vp9', 'av1',
-            'aac', 'mp3', 'opus', 'vorbis', 'flac', 'pcm'
-        }
-        
-        if codec.lower() not in valid_codecs and not codec.startswith('lib'):
+        if codec.lower() not in VALID_CODECS and not codec.startswith('lib'):
             # Warning but not error - allow unknown codecs
             pass
         
@@ -114,6 +151,14 @@ class InputValidator:
 class ConfigValidator:
     """Validate configuration objects"""
     
+    @staticmethod
+    def _source_exists(source_file: Any, existing: Optional[Dict[str, bool]]) -> bool:
+        """Look a source file up in an existence map, checking the disk when it is not there"""
+        found = existing.get(source_file) if existing is not None and isinstance(source_file, str) else None
+        if found is None:
+            found = InputValidator.validate_file_exists(source_file)
+        return found
+    
     @staticmethod
     def validate_download_config(config: Dict[str, Any]) -> Tuple[bool, List[str]]:
         """Validate download configuration"""
@@ -133,20 +178,20 @@ class ConfigValidator:
         return len(errors) == 0, errors
     
     @staticmethod
-    def validate_split_config(config: Dict[str, Any]) -> Tuple[bool, List[str]]:
-        """Validate split configuration"""
+    def validate_split_config(config: Dict[str, Any],
+                              existing: Optional[Dict[str, bool]] = None) -> Tuple[bool, List[str]]:
+        """Validate split configuration; existing maps source paths already checked to whether they exist"""
         errors = []
         
         # Required fields
-        required_fields = ['source_file', 'output_name', 'output_extension', 'max_size']
-        for field in required_fields:
+        for field in SPLIT_REQUIRED_FIELDS:
             if field not in config:
                 errors.append(f"Missing required field: '{field}'")
             elif not str(config[field]).strip():
                 errors.append(f"Field '{field}' cannot be empty")
         
         # Validate source file exists
-        if 'source_file' in config and not InputValidator.validate_file_exists(config['source_file']):
+        if 'source_file' in config and not ConfigValidator._source_exists(config['source_file'], existing):
             errors.append(f"Source file does not exist: '{config['source_file']}'")
         
         # Validate size format
@@ -158,18 +203,18 @@ class ConfigValidator:
         return len(errors) == 0, errors
     
     @staticmethod
-    def validate_clip_config(config: Dict[str, Any]) -> Tuple[bool, List[str]]:
-        """Validate clip configuration"""
+    def validate_clip_config(config: Dict[str, Any],
+                             existing: Optional[Dict[str, bool]] = None) -> Tuple[bool, List[str]]:
+        """Validate clip configuration; existing maps source paths already checked to whether they exist"""
         errors = []
         
         # Required fields
-        required_fields = ['source_file', 'output_name', 'output_extension', 'intervals']
-        for field in required_fields:
+        for field in CLIP_REQUIRED_FIELDS:
             if field not in config:
                 errors.append(f"Missing required field: '{field}'")
         
         # Validate source file exists
-        if 'source_file' in config and not InputValidator.validate_file_exists(config['source_file']):
+        if 'source_file' in config and not ConfigValidator._source_exists(config['source_file'], existing):
             errors.append(f"Source file does not exist: '{config['source_file']}'")
         
         # Validate intervals
@@ -197,7 +242,7 @@ class ConfigValidator:
                     errors.extend(interval_errors)
         
         # Validate codecs if present
-        for codec_field in ['video_codec', 'audio_codec']:
+        for codec_field in CODEC_FIELDS:
             if codec_field in config:
                 codec_valid, codec_error = InputValidator.validate_codec(config[codec_field])
                 if not codec_valid: